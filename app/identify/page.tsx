@@ -83,6 +83,7 @@ export default function IdentifyPage() {
     const formData = new FormData()
     formData.append('image', imageFile)
     formData.append('language', language)
+    formData.append('audio', 'inline')
 
     try {
       const res = await axios.post('http://localhost:5000/identify', formData)
@@ -152,6 +153,7 @@ export default function IdentifyPage() {
       const res = await axios.post('http://localhost:5000/tts', {
         info: plantData.info,
         language,
+        audio: 'inline',
       })
 
       if (res.data.audioBase64) {
@@ -488,6 +490,7 @@ export default function IdentifyPage() {
           const formData = new FormData();
           formData.append('image', file);
           formData.append('language', language);
+          formData.append('audio', 'inline');
           
           setLoading(true);
           
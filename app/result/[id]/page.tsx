@@ -169,7 +169,7 @@ export default function ResultPage() {
       const res = await fetch("http://localhost:5000/tts", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ language: currentLanguage, info: data }),
+        body: JSON.stringify({ language: currentLanguage, info: data, audio: "inline" }),
       })
 
       const { audioBase64 } = await res.json()
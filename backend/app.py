@@ -1,11 +1,16 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, send_file, Response, stream_with_context
 from flask_cors import CORS
 import os
+import re
 import json
 import uuid
-from identify import predict_plant
-from translate import translate_plant_info
-from tts import generate_tts
+import hashlib
+from identify import predict_plant_with_stage, find_similar, get_inference_stats, is_model_ready, get_pool_error, start_warmup, warmup_status, startup_timings, EAGER_MODEL_LOAD
+from translate import translate_plant_info, get_translation_stats
+from tts import generate_tts_audio, stream_tts_audio, defer_tts_audio, ensure_tts_audio, get_tts_audio_path, get_tts_stats, audio_urls_enabled, TTS_AUDIO_MODE, TTS_DEFER_MODE
+from metrics import LatencyStats
+from compiled_catalog import get_translated_plant_info, get_compiled_entry, get_catalog_stats, get_compiled_catalog_version
+from catalog import plant_catalog
 from werkzeug.utils import secure_filename
 import base64
 import secrets
@@ -18,6 +23,8 @@ from dotenv import load_dotenv
 from bson.json_util import dumps
 from bson.objectid import ObjectId
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import mongodb_setup as db
 
 load_dotenv()
@@ -28,7 +35,10 @@ CORS(app)
 UPLOAD_FOLDER = "uploads"
 AUDIO_FOLDER = "static/audio"
 USERS_FILE = "users.json"
-PLANT_INFO_FILE = os.path.join("data", "plant_data.json")
+AUDIO_MAX_AGE = 365 * 24 * 3600
+AUDIO_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+LANGUAGE_PATTERN = re.compile(r"^[A-Za-z]{2,3}(-[A-Za-z]{2,4})?$")
+PLANT_INFO_MAX_AGE = int(os.getenv("PLANT_INFO_MAX_AGE", "3600"))
 HISTORY_FOLDER = os.path.join("data", "history")
 FEEDBACK_FOLDER = os.path.join("data", "feedback")
 
@@ -39,6 +49,12 @@ os.makedirs(FEEDBACK_FOLDER, exist_ok=True)
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 
+if EAGER_MODEL_LOAD:
+    start_warmup()
+
+# Parse the catalog and build its search index before the first request needs them
+plant_catalog.snapshot()
+
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 client = MongoClient(MONGO_URI)
 db = client["leaf_lens_db"]
@@ -61,6 +77,10 @@ if users_collection.count_documents({"email": "admin@leaflens.com"}) == 0:
 
 password_reset_tokens = {}
 
+identify_latency = {}
+identify_latency_lock = threading.Lock()
+upload_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="upload-writer")
+
 def send_reset_email(email, token):
     try:
         reset_url = f"http://localhost:3000/reset-password?token={token}"
@@ -79,9 +99,7 @@ def allowed_file(filename):
 
 def get_plant_info(label):
     try:
-        with open(PLANT_INFO_FILE, "r", encoding="utf-8") as f:
-            info_data = json.load(f)
-        return info_data.get(label)
+        return plant_catalog.get(label)
     except Exception as e:
         print(f"[Plant Info Error] {label}: {e}")
         return None
@@ -93,19 +111,34 @@ def authenticate_user(email, password):
         users = json.load(f)
     return any(u["email"] == email and u["password"] == password for u in users)
 
-def save_image(file, entry_id):
-    if file and allowed_file(file.filename):
-        ext = file.filename.rsplit('.', 1)[1].lower()
-        filename = f"{entry_id}.{ext}"
+def write_upload(data, filename):
+    try:
         filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
-        return filename
-    return None
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+    except Exception as e:
+        print(f"[Upload Write Error] {filename}: {e}")
 
 @app.route("/uploads/<filename>")
 def serve_image(filename):
     return send_from_directory(UPLOAD_FOLDER, filename)
 
+@app.route("/audio/<key>.mp3")
+def serve_audio(key):
+    if not AUDIO_KEY_PATTERN.match(key):
+        return jsonify({"error": "Invalid audio key"}), 400
+
+    path = ensure_tts_audio(key)
+    if not path:
+        return jsonify({"error": "Audio not found"}), 404
+
+    # The key is a digest of the spoken text, so the file never changes under a given URL
+    response = send_file(path, mimetype="audio/mpeg", conditional=True, etag=key, max_age=AUDIO_MAX_AGE)
+    response.headers["Cache-Control"] = f"public, max-age={AUDIO_MAX_AGE}, immutable"
+    return response
+
 @app.route("/signup", methods=["POST"])
 def signup():
     try:
@@ -174,45 +207,177 @@ def login():
         print(f"[Login Error] {e}")
         return jsonify({"error": "Failed to process login"}), 500
 
+def read_identify_upload():
+    if "image" not in request.files:
+        return None, (jsonify({"error": "No image uploaded"}), 400)
+
+    image = request.files["image"]
+    if not image or not allowed_file(image.filename):
+        return None, (jsonify({"error": "Invalid image format"}), 400)
+
+    entry_id = str(uuid.uuid4())
+    ext = image.filename.rsplit('.', 1)[1].lower()
+    filename = f"{entry_id}.{ext}"
+    image_bytes = image.read()
+    upload_writer.submit(write_upload, image_bytes, filename)
+
+    return {
+        "entry_id": entry_id,
+        "filename": filename,
+        "image_bytes": image_bytes,
+        "language": request.form.get("language", "en"),
+        "audio_mode": requested_audio_mode(),
+    }, None
+
+def requested_audio_mode(data=None):
+    mode = request.args.get("audio") or request.form.get("audio") or (data or {}).get("audio") or TTS_AUDIO_MODE
+    return "url" if mode == "url" and audio_urls_enabled() else "inline"
+
+def identify_audio_mode(upload):
+    if upload["audio_mode"] == "url" and TTS_DEFER_MODE in ("background", "lazy"):
+        return TTS_DEFER_MODE
+    return upload["audio_mode"]
+
+def record_identify_latency(mode, started):
+    with identify_latency_lock:
+        stats = identify_latency.setdefault(mode, LatencyStats())
+    stats.record((time.perf_counter() - started) * 1000.0)
+
+def build_audio_payload(text_or_info, language, is_full_info, mode, inline_field="tts", url_field="ttsUrl"):
+    if mode in ("background", "lazy"):
+        # Answer with a handle now; the audio is rendered in the background or on first fetch
+        key, status = defer_tts_audio(text_or_info, language, is_full_info, mode)
+        if not key:
+            return None
+        return {url_field: f"http://localhost:5000/audio/{key}.mp3", "audioStatus": status}
+
+    key, audio = generate_tts_audio(text_or_info, language, is_full_info, for_url=mode == "url")
+    if not audio:
+        return None
+    if mode == "url" and get_tts_audio_path(key):
+        return {url_field: f"http://localhost:5000/audio/{key}.mp3"}
+    # Audio with a skipped chunk is not cached, so it can only be returned inline
+    return {inline_field: base64.b64encode(audio).decode("utf-8")}
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @app.route("/identify", methods=["POST"])
 def identify_plant():
+    started = time.perf_counter()
     try:
-        if "image" not in request.files:
-            return jsonify({"error": "No image uploaded"}), 400
+        upload, error = read_identify_upload()
+        if error:
+            return error
 
-        image = request.files["image"]
-        language = request.form.get("language", "en")
-        entry_id = str(uuid.uuid4())
-        
-        filename = save_image(image, entry_id)
-        if not filename:
-            return jsonify({"error": "Invalid image format"}), 400
+        entry_id = upload["entry_id"]
+        filename = upload["filename"]
+        language = upload["language"]
 
-        image_path = os.path.join(UPLOAD_FOLDER, filename)
-        label, confidence = predict_plant(image_path)
+        label, confidence, stage = predict_plant_with_stage(
+            upload["image_bytes"], index_entry={"id": entry_id, "filename": filename}
+        )
         english_info = get_plant_info(label)
 
         if not english_info:
             return jsonify({"error": f"No info found for '{label}'"}), 404
 
-        translated_info = translate_plant_info(english_info, language)
-        audio_base64 = generate_tts(translated_info, language, is_full_info=True)
+        translated_info, untranslated_fields = get_translated_plant_info(label, english_info, language)
+        audio_mode = identify_audio_mode(upload)
+        audio = build_audio_payload(translated_info, language, True, audio_mode) or {"tts": ""}
 
         image_url = f"http://localhost:5000/uploads/{filename}"
 
-        return jsonify({
+        response = jsonify({
             "id": entry_id,
             "plantName": label,
             "confidence": confidence,
+            "stage": stage,
             "info": translated_info,
-            "tts": audio_base64,
+            "untranslatedFields": untranslated_fields,
+            **audio,
             "imageUrl": image_url
         })
+        record_identify_latency(audio_mode, started)
+        return response
 
     except Exception as e:
         print(f"[Identify Error] {e}")
         return jsonify({"error": "Failed to identify plant"}), 500
 
+@app.route("/identify/stream", methods=["POST"])
+def identify_plant_stream():
+    upload, error = read_identify_upload()
+    if error:
+        return error
+
+    def generate():
+        entry_id = upload["entry_id"]
+        filename = upload["filename"]
+        language = upload["language"]
+        try:
+            label, confidence, stage = predict_plant_with_stage(
+                upload["image_bytes"], index_entry={"id": entry_id, "filename": filename}
+            )
+            yield sse_event("prediction", {
+                "id": entry_id,
+                "plantName": label,
+                "confidence": confidence,
+                "stage": stage,
+                "imageUrl": f"http://localhost:5000/uploads/{filename}"
+            })
+
+            english_info = get_plant_info(label)
+            if not english_info:
+                yield sse_event("error", {"error": f"No info found for '{label}'"})
+                return
+            yield sse_event("info", {"language": "en", "info": english_info})
+
+            translated_info, untranslated_fields = get_translated_plant_info(label, english_info, language)
+            if language != "en":
+                yield sse_event("translation", {
+                    "language": language,
+                    "info": translated_info,
+                    "untranslatedFields": untranslated_fields
+                })
+
+            audio = build_audio_payload(translated_info, language, True, identify_audio_mode(upload)) or {"tts": ""}
+            yield sse_event("audio", audio)
+            yield sse_event("done", {"id": entry_id})
+
+        except Exception as e:
+            print(f"[Identify Stream Error] {e}")
+            yield sse_event("error", {"error": "Failed to identify plant"})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route("/similar/<entry_id>", methods=["GET"])
+def similar_plants(entry_id):
+    try:
+        k = min(max(int(request.args.get("k", 5)), 1), 50)
+        matches = find_similar(entry_id, k)
+
+        if matches is None:
+            return jsonify({"error": f"No embedding found for entry '{entry_id}'"}), 404
+
+        return jsonify([{
+            "id": match["id"],
+            "plantName": match["label"],
+            "confidence": match["confidence"],
+            "similarity": match["similarity"],
+            "imageUrl": f"http://localhost:5000/uploads/{match['filename']}"
+        } for match in matches])
+
+    except ValueError:
+        return jsonify({"error": "k must be an integer"}), 400
+    except Exception as e:
+        print(f"[Similar Error] {e}")
+        return jsonify({"error": "Failed to find similar plants"}), 500
+
 @app.route("/translate", methods=["POST"])
 def translate():
     try:
@@ -230,6 +395,52 @@ def translate():
         print(f"[Translate Error] {e}")
         return jsonify({"error": "Translation failed"}), 500
 
+def plant_info_etag(label, language):
+    # Changes whenever the plant data or the compiled translations are rebuilt
+    version = f"{plant_catalog.snapshot().version}\0{get_compiled_catalog_version()}\0{label}\0{language}"
+    return hashlib.sha256(version.encode("utf-8")).hexdigest()[:32]
+
+def with_cache_headers(response, etag):
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={PLANT_INFO_MAX_AGE}"
+    return response
+
+@app.route("/plant_info/<label>", methods=["GET"])
+def plant_info_lookup(label):
+    try:
+        language = request.args.get("language", "en")
+        if not LANGUAGE_PATTERN.match(language):
+            return jsonify({"error": "Invalid language code"}), 400
+
+        canonical = plant_catalog.snapshot().resolve(label)
+        if canonical is None:
+            return jsonify({"error": f"No data found for plant: {label}"}), 404
+
+        english_info = get_plant_info(canonical)
+        # Live translations depend on the translator and phrase dictionary, so only English and
+        # compiled entries get a strong tag; it is known before any translation work
+        etag = None
+        if language == "en" or get_compiled_entry(canonical, english_info, language) is not None:
+            etag = plant_info_etag(canonical, language)
+            if etag in request.if_none_match:
+                return with_cache_headers(Response(status=304), etag)
+
+        info, untranslated_fields = get_translated_plant_info(canonical, english_info, language)
+        response = jsonify({
+            "plantName": canonical,
+            "language": language,
+            "info": info,
+            "untranslatedFields": untranslated_fields
+        })
+        if etag is None or untranslated_fields:
+            response.headers["Cache-Control"] = "no-store"
+            return response
+        return with_cache_headers(response, etag)
+
+    except Exception as e:
+        print(f"[Plant Info Lookup Error] {e}")
+        return jsonify({"error": "Failed to get plant info"}), 500
+
 @app.route("/get_original_plant_info", methods=["POST"])
 def get_original_plant_info():
     try:
@@ -266,22 +477,107 @@ def tts():
         language = data.get("language", "en")
         info = data.get("info")
 
+        mode = requested_audio_mode(data)
+
         if info and isinstance(info, dict):
-            audio_base64 = generate_tts(info, language, is_full_info=True)
+            audio = build_audio_payload(info, language, True, mode, "audioBase64", "audioUrl")
         elif text:
-            audio_base64 = generate_tts(text, language)
+            audio = build_audio_payload(text, language, False, mode, "audioBase64", "audioUrl")
         else:
             return jsonify({"error": "No input provided for TTS"}), 400
 
-        if not audio_base64:
+        if not audio:
             return jsonify({"error": "TTS generation failed"}), 500
 
-        return jsonify({"audioBase64": audio_base64})
+        return jsonify(audio)
 
     except Exception as e:
         print(f"[TTS Error] {e}")
         return jsonify({"error": "TTS failed"}), 500
 
+@app.route("/tts/stream", methods=["POST"])
+def tts_stream():
+    data = request.get_json(silent=True) or {}
+    text = data.get("text", "")
+    language = data.get("language", "en")
+    info = data.get("info")
+
+    if info and isinstance(info, dict):
+        audio = stream_tts_audio(info, language, is_full_info=True)
+    elif text:
+        audio = stream_tts_audio(text, language)
+    else:
+        return jsonify({"error": "No input provided for TTS"}), 400
+
+    # Chunks are sent as soon as they are synthesized, in playback order
+    return Response(
+        stream_with_context(audio),
+        mimetype="audio/mpeg",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route("/search", methods=["GET"])
+def search_plants():
+    try:
+        query = request.args.get("q", "").strip()
+        if not query:
+            return jsonify({"error": "Query parameter 'q' is required"}), 400
+        limit = min(max(int(request.args.get("limit", 10)), 1), 100)
+        prefix = request.args.get("prefix", "1") not in ("0", "false")
+
+        # Results and their details must come from the same snapshot while a reload swaps it
+        snapshot = plant_catalog.snapshot()
+        if snapshot is None:
+            return jsonify({"error": "Plant catalog unavailable"}), 503
+        started = time.perf_counter()
+        results, matched = snapshot.search(query, limit, prefix)
+        took_ms = (time.perf_counter() - started) * 1000.0
+
+        return jsonify({
+            "query": query,
+            "matchedTerms": matched,
+            "tookMs": round(took_ms, 3),
+            "results": [{
+                "plantName": result["label"],
+                "score": result["score"],
+                "scientific_name": snapshot.entries[result["label"]].get("scientific_name"),
+                "family": snapshot.entries[result["label"]].get("family"),
+            } for result in results]
+        })
+
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    except Exception as e:
+        print(f"[Search Error] {e}")
+        return jsonify({"error": "Search failed"}), 500
+
+@app.route("/ready", methods=["GET"])
+def ready():
+    if is_model_ready():
+        return jsonify({"status": "ready", "warmup": warmup_status, "startup": startup_timings}), 200
+    pool_error = get_pool_error()
+    status = "failed" if pool_error else warmup_status["state"]
+    return jsonify({"status": status, "warmup": warmup_status, "inference_pool_error": pool_error,
+                    "startup": startup_timings}), 503
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    try:
+        with identify_latency_lock:
+            latency_by_mode = dict(identify_latency)
+        return jsonify({
+            "inference": get_inference_stats(),
+            "translation": get_translation_stats(),
+            "catalog": get_catalog_stats(),
+            "plant_catalog": plant_catalog.stats(),
+            "tts": get_tts_stats(),
+            "identify_latency_ms": {mode: stats.summary() for mode, stats in latency_by_mode.items()}
+        })
+
+    except Exception as e:
+        print(f"[Stats Error] {e}")
+        return jsonify({"error": "Failed to collect stats"}), 500
+
 @app.route("/save_history", methods=["POST"])
 def save_history():
     try:
@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+from concurrent.futures import Future
+
+from metrics import Counters
+
+
+class AudioJobs:
+
+    def __init__(self, render_fn, executor, pending_dir=None):
+        self.render_fn = render_fn
+        self.executor = executor
+        self.pending_dir = pending_dir or None
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.counters = Counters("started", "coalesced", "completed", "failed", "lazy_starts")
+
+    def _claim(self, key):
+        with self._lock:
+            future = self._jobs.get(key)
+            if future is not None:
+                self.counters.incr("coalesced")
+                return future, False
+            future = self._jobs[key] = Future()
+        self.counters.incr("started")
+        return future, True
+
+    def _execute(self, key, text, lang, future):
+        try:
+            future.set_result(self.render_fn(key, text, lang))
+            self.counters.incr("completed")
+        except Exception as e:
+            print(f"[Audio Job Error] {key}: {e}")
+            future.set_exception(e)
+            self.counters.incr("failed")
+        finally:
+            with self._lock:
+                self._jobs.pop(key, None)
+
+    def run(self, key, text, lang):
+        # Renders in the calling thread unless the same audio is already being rendered
+        future, owner = self._claim(key)
+        if owner:
+            self._execute(key, text, lang, future)
+        return future.result()
+
+    def submit(self, key, text, lang):
+        future, owner = self._claim(key)
+        if owner:
+            self.executor.submit(self._execute, key, text, lang, future)
+        return future
+
+    def _pending_path(self, key):
+        return os.path.join(self.pending_dir, f"{key}.pending.json")
+
+    def register(self, key, text, lang):
+        # Kept on disk so whichever worker receives a fetch can render it, including after the
+        # audio was evicted; the TTS cache expires these along with the audio files
+        if not self.pending_dir:
+            return
+        path = self._pending_path(key)
+        try:
+            # Handing the URL out again counts as a use for LRU eviction
+            os.utime(path)
+            return
+        except FileNotFoundError:
+            pass
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"text": text, "lang": lang}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[Audio Job Error] Could not register {key}: {e}")
+
+    def ensure(self, key, timeout=None):
+        with self._lock:
+            future = self._jobs.get(key)
+        if future is None:
+            if not self.pending_dir:
+                return None
+            try:
+                with open(self._pending_path(key), "r", encoding="utf-8") as f:
+                    pending = json.load(f)
+            except (FileNotFoundError, ValueError):
+                return None
+            self.counters.incr("lazy_starts")
+            future = self.submit(key, pending["text"], pending["lang"])
+        return future.result(timeout=timeout)
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._jobs)
+        return {**self.counters.snapshot(), "in_flight": in_flight}
@@ -0,0 +1,77 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from metrics import LatencyStats
+
+
+class InferenceBatcher:
+
+    def __init__(self, predict_fn, max_batch_size=8, max_wait_ms=10.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batch_sizes = LatencyStats()
+        self.queue_wait_ms = LatencyStats()
+        self.forward_ms = LatencyStats()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, img_array):
+        self._ensure_started()
+        future = Future()
+        self._queue.put((img_array, future, time.perf_counter()))
+        return future.result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                self.queue_wait_ms.record((started - enqueued) * 1000.0)
+            self.batch_sizes.record(len(batch))
+
+            try:
+                results = self.predict_fn(np.stack([item[0] for item in batch]))
+            except Exception as e:
+                print(f"[Batcher Error] Batch of {len(batch)} failed: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            self.forward_ms.record((time.perf_counter() - started) * 1000.0)
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "pending": self._queue.qsize(),
+            "batch_size": self.batch_sizes.summary(),
+            "queue_wait_ms": self.queue_wait_ms.summary(),
+            "forward_ms": self.forward_ms.summary(),
+        }
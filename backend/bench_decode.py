@@ -0,0 +1,88 @@
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from identify import preprocess_image_bytes
+from metrics import LatencyStats
+
+
+def make_test_jpeg(width=4000, height=3000, quality=90):
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    pixels = np.clip(gradient + rng.normal(0, 25, (height, width, 3)), 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def time_stage(stats, fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    stats.record((time.perf_counter() - started) * 1000.0)
+    return result
+
+
+def bench_disk_path(data, iterations, folder):
+    from tensorflow.keras.preprocessing import image
+
+    stages = {name: LatencyStats() for name in ("write", "decode_resize", "normalize", "total")}
+    path = os.path.join(folder, "upload.jpg")
+
+    def write():
+        with open(path, "wb") as f:
+            f.write(data)
+
+    for _ in range(iterations):
+        started = time.perf_counter()
+        time_stage(stages["write"], write)
+        img = time_stage(stages["decode_resize"], lambda: image.load_img(path, target_size=(224, 224)))
+        time_stage(stages["normalize"], lambda: image.img_to_array(img) / 255.0)
+        stages["total"].record((time.perf_counter() - started) * 1000.0)
+    return {name: stats.summary() for name, stats in stages.items()}
+
+
+def bench_memory_path(data, iterations):
+    stages = {name: LatencyStats() for name in ("decode_resize_normalize", "total")}
+    for _ in range(iterations):
+        started = time.perf_counter()
+        time_stage(stages["decode_resize_normalize"], preprocess_image_bytes, data)
+        stages["total"].record((time.perf_counter() - started) * 1000.0)
+    return {name: stats.summary() for name, stats in stages.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare write-then-reread and in-memory image preprocessing")
+    parser.add_argument("--image", help="JPEG to use instead of a generated 12 MP photo")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.image:
+        with open(args.image, "rb") as f:
+            data = f.read()
+    else:
+        data = make_test_jpeg()
+
+    with Image.open(io.BytesIO(data)) as img:
+        size = img.size
+
+    with tempfile.TemporaryDirectory() as folder:
+        disk = bench_disk_path(data, args.iterations, folder)
+    memory = bench_memory_path(data, args.iterations)
+
+    print(json.dumps({
+        "image": {"width": size[0], "height": size[1], "bytes": len(data)},
+        "iterations": args.iterations,
+        "disk_path_ms": disk,
+        "memory_path_ms": memory,
+        "speedup_p50": round(disk["total"]["p50"] / max(memory["total"]["p50"], 1e-6), 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
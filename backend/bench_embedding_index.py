@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from embedding_index import EmbeddingIndex
+from metrics import LatencyStats
+
+
+def write_index(folder, rows, dim, input_dim, seed=0):
+    # Writes the on-disk layout directly; appending hundreds of thousands of rows one by one is too slow
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((rows, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors.astype(np.float16).tofile(os.path.join(folder, "vectors.f16"))
+    with open(os.path.join(folder, "ids.jsonl"), "w", encoding="utf-8") as f:
+        for i in range(rows):
+            f.write(json.dumps({"id": f"e{i}", "filename": f"e{i}.jpg", "label": "Tulsi", "confidence": 0.9}) + "\n")
+    with open(os.path.join(folder, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"dim": dim, "input_dim": input_dim}, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure embedding index load, query and append latency")
+    parser.add_argument("--sizes", default="10000,100000,300000", help="Comma-separated index sizes to try")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--input-dim", type=int, default=2048, help="Width of the raw embeddings before projection")
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    results = []
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        with tempfile.TemporaryDirectory() as folder:
+            write_index(folder, size, args.dim, args.input_dim)
+            started = time.perf_counter()
+            index = EmbeddingIndex(folder, args.dim)
+            load_ms = (time.perf_counter() - started) * 1000.0
+
+            query_ms = LatencyStats(window=args.queries)
+            by_id_ms = LatencyStats(window=args.queries)
+            for i in range(args.queries):
+                started = time.perf_counter()
+                index.query(rng.standard_normal(args.input_dim), k=5)
+                query_ms.record((time.perf_counter() - started) * 1000.0)
+                started = time.perf_counter()
+                index.query_by_id(f"e{i}", k=5)
+                by_id_ms.record((time.perf_counter() - started) * 1000.0)
+
+            append_ms = LatencyStats(window=args.queries)
+            for i in range(args.queries):
+                started = time.perf_counter()
+                index.append({"id": f"new{i}", "filename": f"new{i}.jpg", "label": "Tulsi", "confidence": 0.9},
+                             rng.standard_normal(args.input_dim))
+                append_ms.record((time.perf_counter() - started) * 1000.0)
+
+            results.append({
+                "rows": size,
+                "load_ms": round(load_ms, 1),
+                "memory_mb": round(index.stats()["memory_bytes"] / 1e6, 1),
+                "query_ms": query_ms.summary(),
+                "query_by_id_ms": by_id_ms.summary(),
+                "append_ms": append_ms.summary(),
+            })
+            print(f"{size} rows: load {load_ms:.0f} ms, query p50 {results[-1]['query_ms']['p50']} ms")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from metrics import percentile
+
+DEFAULT_BATCH_SIZES = "1,4,8,16"
+DEFAULT_INTER_OP = "1,2"
+
+
+def default_intra_op():
+    cores = os.cpu_count() or 1
+    counts = {1, cores}
+    count = 2
+    while count < cores:
+        counts.add(count)
+        count *= 2
+    return ",".join(str(c) for c in sorted(counts))
+
+
+def parse_ints(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def load_bench_model(kind):
+    if kind == "real":
+        import identify
+        identify.load_model_if_needed()
+        return identify.model
+
+    import standin_model
+    return standin_model.build_standin_model("xception" if kind == "standin" else "small")
+
+
+def run_config(config, model_kind, iterations, warmup):
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(config["intra_op"])
+    tf.config.threading.set_inter_op_parallelism_threads(config["inter_op"])
+
+    model = load_bench_model(model_kind)
+    model.compile(jit_compile=config["xla"])
+
+    batch = np.random.default_rng(0).random((config["batch_size"], 224, 224, 3), dtype=np.float32)
+    for _ in range(warmup):
+        model.predict_on_batch(batch)
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        model.predict_on_batch(batch)
+        latencies.append((time.perf_counter() - call_started) * 1000.0)
+    elapsed = time.perf_counter() - started
+
+    return {
+        **config,
+        "images_per_sec": round(config["batch_size"] * iterations / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+        },
+    }
+
+
+def run_in_subprocess(config, args):
+    # Thread pools can only be sized before TensorFlow initialises, so each config gets a fresh process
+    command = [
+        sys.executable, os.path.abspath(__file__),
+        "--model", args.model,
+        "--iterations", str(args.iterations),
+        "--warmup", str(args.warmup),
+        "--run-config", json.dumps(config),
+    ]
+    # identify would otherwise apply the saved tf_config.json on top of the swept thread counts
+    env = {**os.environ, "TF_CONFIG_PATH": ""}
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=os.getcwd(), env=env)
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    print(f"[Benchmark Error] {config}: {completed.stderr.strip()[-500:]}")
+    return None
+
+
+def pick_best(results, p99_budget_ms):
+    candidates = [r for r in results if not p99_budget_ms or r["latency_ms"]["p99"] <= p99_budget_ms]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda r: r["images_per_sec"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep TensorFlow threading, XLA and batch size for predict_plant")
+    parser.add_argument("--model", choices=["standin", "small", "real"], default="standin",
+                        help="standin is an untrained Xception with the production input shape")
+    parser.add_argument("--batch-sizes", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--intra-op", default=default_intra_op())
+    parser.add_argument("--inter-op", default=DEFAULT_INTER_OP)
+    parser.add_argument("--xla", default="off,on", help="Comma-separated subset of off,on")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--p99-budget-ms", type=float, default=0,
+                        help="Only configs whose p99 batch latency fits this budget can be picked as best")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--save-best", nargs="?", const=os.path.join("model", "tf_config.json"),
+                        help="Persist the best config for load_model_if_needed")
+    parser.add_argument("--run-config", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_config:
+        print(json.dumps(run_config(json.loads(args.run_config), args.model, args.iterations, args.warmup)))
+        return
+
+    results = []
+    sweep = itertools.product(
+        parse_ints(args.batch_sizes),
+        parse_ints(args.intra_op),
+        parse_ints(args.inter_op),
+        [mode.strip() == "on" for mode in args.xla.split(",") if mode.strip()],
+    )
+    for batch_size, intra_op, inter_op, xla in sweep:
+        config = {"batch_size": batch_size, "intra_op": intra_op, "inter_op": inter_op, "xla": xla}
+        result = run_in_subprocess(config, args)
+        if result:
+            print(f"{config}: {result['images_per_sec']} images/sec, p99 {result['latency_ms']['p99']} ms",
+                  file=sys.stderr)
+            results.append(result)
+
+    best = pick_best(results, args.p99_budget_ms)
+    report = {"model": args.model, "cores": os.cpu_count(), "results": results, "best": best}
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+    if args.save_best and best:
+        os.makedirs(os.path.dirname(args.save_best) or ".", exist_ok=True)
+        with open(args.save_best, "w", encoding="utf-8") as f:
+            json.dump({key: best[key] for key in ("batch_size", "intra_op", "inter_op", "xla")}, f, indent=2)
+        print(f"Saved best config to {args.save_best}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from inference_pool import InferencePool
+from metrics import LatencyStats
+import standin_model
+
+
+def run_load(submit, requests, concurrency):
+    rng = np.random.default_rng(0)
+    images = rng.random((concurrency, 224, 224, 3), dtype=np.float32)
+    latency = LatencyStats(window=requests)
+    counter = iter(range(requests))
+    counter_lock = threading.Lock()
+
+    def client(client_id):
+        while True:
+            with counter_lock:
+                if next(counter, None) is None:
+                    return
+            started = time.perf_counter()
+            submit(images[client_id])
+            latency.record((time.perf_counter() - started) * 1000.0)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {"images_per_sec": round(requests / elapsed, 2), "latency_ms": latency.summary()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure inference worker pool throughput against a stand-in model")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts to try")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--model", choices=["xception", "small"], default="xception")
+    parser.add_argument("--intra-op-threads", type=int, default=0,
+                        help="TensorFlow threads per worker (0 = cores / workers)")
+    args = parser.parse_args()
+
+    loader = standin_model.load_xception_standin if args.model == "xception" else standin_model.load_small_standin
+    cores = os.cpu_count() or 1
+    results = []
+
+    for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+        threads = args.intra_op_threads or max(1, cores // workers)
+        pool = InferencePool(workers, loader, num_slots=args.concurrency, intra_op_threads=threads)
+        try:
+            warm = np.zeros((224, 224, 3), dtype=np.float32)
+            run_load(lambda _: pool.submit(warm), workers * 2, workers)
+            result = run_load(pool.submit, args.requests, args.concurrency)
+        finally:
+            pool.close()
+        result.update({"workers": workers, "intra_op_threads": threads})
+        results.append(result)
+        print(f"workers={workers}: {result['images_per_sec']} images/sec")
+
+    baseline = results[0]["images_per_sec"] if results else 0
+    for result in results:
+        result["scaling"] = round(result["images_per_sec"] / baseline, 2) if baseline else 0.0
+
+    print(json.dumps({"cores": cores, "model": args.model, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import json
+import os
+import time
+
+from metrics import LatencyStats
+from search_index import SearchIndex
+
+PLANT_INFO_FILE = os.path.join("data", "plant_data.json")
+QUERIES = ["anti-inflammatory high", "digestive", "Africa", "Rutaceae", "tul", "skin wou", "fever cough india"]
+
+
+def grow_catalog(plant_data, size):
+    # Copies of the real entries under new names stand in for a larger species list
+    entries = {}
+    while len(entries) < size:
+        for label, info in plant_data.items():
+            if len(entries) >= size:
+                break
+            copy = len(entries) // len(plant_data)
+            entries[f"{label} {copy}" if copy else label] = info
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure catalog search index build time and query latency")
+    parser.add_argument("--sizes", default="80,1000,5000", help="Comma-separated catalog sizes to try")
+    parser.add_argument("--repeat", type=int, default=200, help="Times each query is run")
+    args = parser.parse_args()
+
+    with open(PLANT_INFO_FILE, "r", encoding="utf-8") as f:
+        plant_data = json.load(f)
+
+    results = []
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        entries = grow_catalog(plant_data, size)
+        started = time.perf_counter()
+        index = SearchIndex(entries)
+        build_ms = (time.perf_counter() - started) * 1000.0
+
+        latency = LatencyStats(window=args.repeat * len(QUERIES))
+        for _ in range(args.repeat):
+            for query in QUERIES:
+                started = time.perf_counter()
+                index.search(query)
+                latency.record((time.perf_counter() - started) * 1000.0)
+
+        results.append({
+            "plants": len(entries),
+            "terms": len(index.postings),
+            "build_ms": round(build_ms, 2),
+            "query_ms": latency.summary(),
+        })
+        print(f"{len(entries)} plants: build {build_ms:.1f} ms, query p50 {results[-1]['query_ms']['p50']} ms")
+
+    print(json.dumps({"queries": QUERIES, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import time
+
+import translate
+from metrics import LatencyStats
+from translation_cache import TranslationCache
+from translator_backends import FakeTranslatorBackend
+
+PLANT_INFO_FILE = os.path.join("data", "plant_data.json")
+
+
+def run_records(plant_data, language, concurrency, batch_items, deadline_ms, latency, fail_times):
+    # Cold in-memory cache and a fresh stand-in per run so every record pays for its round trips
+    translate.translation_cache = TranslationCache(None)
+    translate.TRANSLATION_CONCURRENCY = concurrency
+    translate.TRANSLATION_BATCH_MAX_ITEMS = batch_items
+    backend = FakeTranslatorBackend(latency=latency, fail_times=fail_times)
+    translate.set_translator_backend(backend)
+
+    stats = LatencyStats(window=len(plant_data))
+    untranslated_records = 0
+    for info in plant_data.values():
+        started = time.perf_counter()
+        _, untranslated = translate.translate_plant_info_with_status(info, language, deadline_ms)
+        stats.record((time.perf_counter() - started) * 1000.0)
+        untranslated_records += bool(untranslated)
+
+    return {
+        "concurrency": concurrency,
+        "record_ms": stats.summary(),
+        "remote_calls": backend.calls,
+        "records_with_untranslated_fields": untranslated_records,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time per-record translation with and without concurrent dispatch")
+    parser.add_argument("--concurrency", default="1,4,8", help="Comma-separated per-record concurrency caps to try")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Simulated latency of each translator call")
+    parser.add_argument("--batch-items", type=int, default=1,
+                        help="Strings per translator call (1 sends every field on its own)")
+    parser.add_argument("--deadline-ms", type=float, default=0.0, help="Per-record deadline (0 = none)")
+    parser.add_argument("--fail-times", type=int, default=0, help="Simulated failures before calls succeed")
+    parser.add_argument("--plants", type=int, default=10)
+    parser.add_argument("--language", default="hi")
+    args = parser.parse_args()
+
+    with open(PLANT_INFO_FILE, "r", encoding="utf-8") as f:
+        plant_data = dict(list(json.load(f).items())[:args.plants])
+
+    results = []
+    for concurrency in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+        result = run_records(plant_data, args.language, concurrency, args.batch_items,
+                             args.deadline_ms, args.latency_ms / 1000.0, args.fail_times)
+        results.append(result)
+        print(f"concurrency={concurrency}: p50 {result['record_ms']['p50']} ms per record")
+
+    baseline = results[0]["record_ms"]["mean"] if results else 0
+    for result in results:
+        result["speedup"] = round(baseline / result["record_ms"]["mean"], 2) if result["record_ms"]["mean"] else 0.0
+
+    print(json.dumps({
+        "latency_ms": args.latency_ms,
+        "batch_items": args.batch_items,
+        "deadline_ms": args.deadline_ms,
+        "results": results,
+        "translation": translate.get_translation_stats(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
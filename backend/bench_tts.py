@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import tts
+from metrics import LatencyStats
+from tts_cache import TTSCache
+from tts_synthesizers import FakeSynthesizer
+
+PLANT_INFO_FILE = os.path.join("data", "plant_data.json")
+
+
+def run_records(plant_data, concurrency, chunk_chars, latency, latency_per_char):
+    # No cache, so every record is synthesized from scratch
+    tts.tts_cache = TTSCache(None)
+    tts.TTS_CONCURRENCY = concurrency
+    tts.TTS_CHUNK_CHARS = chunk_chars
+    synthesizer = FakeSynthesizer(latency=latency, latency_per_char=latency_per_char)
+    tts.set_synthesizer(synthesizer)
+
+    first_chunk = LatencyStats(window=len(plant_data))
+    total = LatencyStats(window=len(plant_data))
+    for info in plant_data.values():
+        text, lang = tts.resolve_tts_text(info, "en", is_full_info=True)
+        started = time.perf_counter()
+        for index, _ in enumerate(tts.iter_synthesized_chunks(text, lang)):
+            if index == 0:
+                first_chunk.record((time.perf_counter() - started) * 1000.0)
+        total.record((time.perf_counter() - started) * 1000.0)
+
+    return {
+        "concurrency": concurrency,
+        "chunk_chars": chunk_chars,
+        "first_chunk_ms": first_chunk.summary(),
+        "total_ms": total.summary(),
+        "synthesizer_calls": synthesizer.calls,
+    }
+
+
+def run_audio_stage(plant_data, mode, latency, latency_per_char):
+    # The audio stage of /identify on a cold cache: synchronous rendering against a deferred handle
+    tts.tts_cache = TTSCache(tempfile.mkdtemp(prefix="bench_tts_"))
+    tts.audio_jobs.pending_dir = tts.tts_cache.directory
+    tts.set_synthesizer(FakeSynthesizer(latency=latency, latency_per_char=latency_per_char))
+
+    stage = LatencyStats(window=len(plant_data))
+    for info in plant_data.values():
+        started = time.perf_counter()
+        if mode == "sync":
+            tts.generate_tts_audio(info, "en", is_full_info=True)
+        else:
+            tts.defer_tts_audio(info, "en", is_full_info=True, mode=mode)
+        stage.record((time.perf_counter() - started) * 1000.0)
+    return {"mode": mode, "audio_stage_ms": stage.summary()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time sentence-chunked parallel TTS against a stand-in synthesizer")
+    parser.add_argument("--concurrency", default="1,4,8", help="Comma-separated per-request concurrency caps to try")
+    parser.add_argument("--chunk-chars", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Fixed simulated cost of each synthesis call")
+    parser.add_argument("--latency-per-char-ms", type=float, default=2.0,
+                        help="Simulated cost per character, as gTTS makes one request per ~100 characters")
+    parser.add_argument("--plants", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(PLANT_INFO_FILE, "r", encoding="utf-8") as f:
+        plant_data = dict(list(json.load(f).items())[:args.plants])
+
+    # One whole-text call per record is the old behaviour
+    results = [run_records(plant_data, 1, 5000, args.latency_ms / 1000.0, args.latency_per_char_ms / 1000.0)]
+    results[0]["mode"] = "whole_text"
+    for concurrency in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+        result = run_records(plant_data, concurrency, args.chunk_chars,
+                             args.latency_ms / 1000.0, args.latency_per_char_ms / 1000.0)
+        result["mode"] = "chunked"
+        results.append(result)
+
+    for result in results:
+        print(f"{result['mode']} concurrency={result['concurrency']}: first chunk p50 "
+              f"{result['first_chunk_ms']['p50']} ms, total p50 {result['total_ms']['p50']} ms")
+    audio_stage = [run_audio_stage(plant_data, mode, args.latency_ms / 1000.0, args.latency_per_char_ms / 1000.0)
+                   for mode in ("sync", "background", "lazy")]
+    for result in audio_stage:
+        print(f"/identify audio stage ({result['mode']}): p50 {result['audio_stage_ms']['p50']} ms, "
+              f"p99 {result['audio_stage_ms']['p99']} ms")
+
+    print(json.dumps({"results": results, "identify_audio_stage": audio_stage}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
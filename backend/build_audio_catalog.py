@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from compiled_catalog import configured_languages, get_translated_plant_info
+from tts import AUDIO_CATALOG_DIR, SUPPORTED_LANGUAGES, iter_synthesized_chunks, resolve_tts_text
+from tts_cache import make_tts_key
+
+PLANT_INFO_FILE = os.path.join("data", "plant_data.json")
+
+
+def write_atomic(path, data):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def plan_jobs(plant_data, languages):
+    jobs, skipped = {}, []
+    for label, english_info in plant_data.items():
+        for lang in languages:
+            info, untranslated = get_translated_plant_info(label, english_info, lang)
+            if untranslated:
+                # Audio for half-translated text would be wrong until the next build
+                skipped.append(f"{label} ({lang})")
+                continue
+            text, tts_lang = resolve_tts_text(info, lang, is_full_info=True)
+            if text is None:
+                continue
+            key = make_tts_key(text, tts_lang)
+            jobs.setdefault(key, {"text": text, "lang": tts_lang, "entries": []})["entries"].append((label, lang))
+    return jobs, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render full-info audio for every plant and language")
+    parser.add_argument("--languages", help="Comma-separated language codes, or 'all' for every TTS language "
+                                            "(default: en plus CATALOG_LANGUAGES)")
+    parser.add_argument("--input", default=PLANT_INFO_FILE)
+    parser.add_argument("--output", default=AUDIO_CATALOG_DIR)
+    parser.add_argument("--workers", type=int, default=4, help="Records rendered at once")
+    args = parser.parse_args()
+
+    if args.languages == "all":
+        languages = sorted(lang.lower() for lang in SUPPORTED_LANGUAGES)
+    elif args.languages:
+        languages = [lang.strip() for lang in args.languages.split(",") if lang.strip()]
+    else:
+        languages = ["en"] + configured_languages()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        plant_data = json.load(f)
+
+    os.makedirs(args.output, exist_ok=True)
+    manifest_path = os.path.join(args.output, "manifest.json")
+    manifest = {"entries": {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    manifest_lock = threading.Lock()
+
+    def record(key, job, size):
+        with manifest_lock:
+            for label, lang in job["entries"]:
+                manifest["entries"].setdefault(label, {})[lang] = {"key": key, "bytes": size}
+            # Saved after every record so an interrupted build resumes where it stopped
+            write_atomic(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True).encode("utf-8"))
+
+    def render(key, job):
+        skipped_chunks = []
+        audio = b"".join(iter_synthesized_chunks(job["text"], job["lang"], skipped_chunks))
+        if skipped_chunks:
+            # Catalog files are never evicted or re-rendered, so a gap would be permanent
+            raise RuntimeError(f"chunks {skipped_chunks} failed; left for the next run")
+        write_atomic(os.path.join(args.output, f"{key}.mp3"), audio)
+        return len(audio)
+
+    started = time.perf_counter()
+    jobs, skipped = plan_jobs(plant_data, languages)
+    rendered = reused = failed = 0
+
+    pending = {}
+    for key, job in jobs.items():
+        path = os.path.join(args.output, f"{key}.mp3")
+        if os.path.exists(path):
+            record(key, job, os.path.getsize(path))
+            reused += 1
+        else:
+            pending[key] = job
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {executor.submit(render, key, job): key for key, job in pending.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                record(key, jobs[key], future.result())
+                rendered += 1
+            except Exception as e:
+                failed += 1
+                print(f"[Audio Catalog Error] {jobs[key]['entries'][0]}: {e}")
+            if (rendered + failed) % 50 == 0:
+                print(f"Rendered {rendered} of {len(pending)} records...")
+
+    print(json.dumps({
+        "output": args.output,
+        "languages": len(languages),
+        "records": len(jobs),
+        "rendered": rendered,
+        "reused": reused,
+        "failed": failed,
+        "skipped_untranslated": skipped,
+        "seconds": round(time.perf_counter() - started, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
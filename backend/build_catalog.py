@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import time
+
+from compiled_catalog import (
+    COMPILED_CATALOG_PATH,
+    configured_languages,
+    read_compiled_catalog,
+    source_digest,
+    write_compiled_catalog,
+)
+from translate import get_translation_stats, translate_plant_info_with_status
+from tts import SUPPORTED_LANGUAGES
+
+PLANT_INFO_FILE = os.path.join("data", "plant_data.json")
+
+
+def build(plant_data, languages, previous, force=False):
+    compiled = {
+        "format": previous["format"],
+        "languages": languages,
+        "sources": {},
+        "entries": {},
+    }
+    translated = reused = 0
+
+    for label, info in plant_data.items():
+        digest = source_digest(info)
+        unchanged = not force and previous["sources"].get(label) == digest
+        old_entries = previous["entries"].get(label, {}) if unchanged else {}
+
+        compiled["sources"][label] = digest
+        compiled["entries"][label] = {}
+        for lang in languages:
+            if lang in old_entries:
+                compiled["entries"][label][lang] = old_entries[lang]
+                reused += 1
+                continue
+            # No deadline offline; entries with untranslated fields are retried on the next build
+            translated_info, untranslated = translate_plant_info_with_status(info, lang, deadline_ms=0)
+            if untranslated:
+                print(f"[Catalog Warning] {label} ({lang}): untranslated fields {untranslated}")
+                continue
+            compiled["entries"][label][lang] = translated_info
+            translated += 1
+
+        if translated and translated % 50 == 0:
+            print(f"Translated {translated} plant/language entries...")
+
+    return compiled, translated, reused
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Translate the plant catalog into every configured language")
+    parser.add_argument("--languages", help="Comma-separated language codes, or 'all' for every TTS language "
+                                            "(default: CATALOG_LANGUAGES)")
+    parser.add_argument("--input", default=PLANT_INFO_FILE)
+    parser.add_argument("--output", default=COMPILED_CATALOG_PATH)
+    parser.add_argument("--force", action="store_true", help="Retranslate every plant, even unchanged ones")
+    args = parser.parse_args()
+
+    if args.languages == "all":
+        languages = sorted(lang.lower() for lang in SUPPORTED_LANGUAGES if lang != "en")
+    elif args.languages:
+        languages = [lang.strip() for lang in args.languages.split(",") if lang.strip() and lang.strip() != "en"]
+    else:
+        languages = configured_languages()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        plant_data = json.load(f)
+
+    started = time.perf_counter()
+    previous = read_compiled_catalog(args.output)
+    compiled, translated, reused = build(plant_data, languages, previous, args.force)
+    write_compiled_catalog(compiled, args.output)
+
+    print(json.dumps({
+        "output": args.output,
+        "plants": len(plant_data),
+        "languages": len(languages),
+        "translated": translated,
+        "reused": reused,
+        "seconds": round(time.perf_counter() - started, 2),
+        "translation": get_translation_stats(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
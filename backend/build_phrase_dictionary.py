@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+from collections import Counter
+
+from compiled_catalog import configured_languages
+from translate import KEY_LABELS, PHRASE_DICTIONARY_PATH, preprocess_plant_info, translate_batch
+from tts import SUPPORTED_LANGUAGES
+
+PLANT_INFO_FILE = os.path.join("data", "plant_data.json")
+
+
+def collect_vocabulary(plant_data, min_count=2):
+    # Maps each lookup key (text as translate_plant_info sees it, after preprocessing)
+    # to the clean English phrase that is actually sent to the translator
+    vocabulary = {}
+    value_counts = Counter(
+        value for info in plant_data.values()
+        for value in info.get("properties", {}).values() if isinstance(value, str)
+    )
+
+    for info in plant_data.values():
+        processed_info = preprocess_plant_info(info)
+        for key, (processed_key, processed_value) in zip(info, processed_info.items()):
+            value = info[key]
+            vocabulary[KEY_LABELS.get(processed_key, processed_key)] = KEY_LABELS.get(key, key)
+            if key == "regions" and isinstance(value, list):
+                for region, processed_region in zip(value, processed_value):
+                    if isinstance(region, str):
+                        vocabulary[processed_region] = region
+            elif isinstance(value, dict):
+                for (prop_key, prop_value), (processed_prop_key, processed_prop_value) in zip(
+                    value.items(), processed_value.items()
+                ):
+                    vocabulary[processed_prop_key] = prop_key
+                    if isinstance(prop_value, str) and value_counts[prop_value] >= min_count:
+                        vocabulary[processed_prop_value] = prop_value
+
+    return vocabulary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Translate the closed plant vocabulary into a per-language phrase dictionary")
+    parser.add_argument("--languages", help="Comma-separated language codes, or 'all' for every TTS language "
+                                            "(default: CATALOG_LANGUAGES)")
+    parser.add_argument("--input", default=PLANT_INFO_FILE)
+    parser.add_argument("--output", default=PHRASE_DICTIONARY_PATH)
+    parser.add_argument("--min-count", type=int, default=2,
+                        help="Property values must recur this often across plants to count as vocabulary")
+    args = parser.parse_args()
+
+    if args.languages == "all":
+        languages = sorted(lang.lower() for lang in SUPPORTED_LANGUAGES if lang != "en")
+    elif args.languages:
+        languages = [lang.strip() for lang in args.languages.split(",") if lang.strip() and lang.strip() != "en"]
+    else:
+        languages = configured_languages()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        plant_data = json.load(f)
+    vocabulary = collect_vocabulary(plant_data, args.min_count)
+
+    # Hand-corrected entries in an existing dictionary are kept
+    dictionary = {}
+    if os.path.exists(args.output):
+        with open(args.output, "r", encoding="utf-8") as f:
+            dictionary = json.load(f)
+
+    for lang in languages:
+        phrases = dictionary.setdefault(lang, {})
+        missing = {key: source for key, source in vocabulary.items() if key not in phrases}
+        translations = translate_batch(list(set(missing.values())), lang)
+        for key, source in missing.items():
+            if source in translations:
+                phrases[key] = translations[source]
+        print(f"{lang}: {len(phrases)} phrases ({len(missing)} new)")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    tmp_path = f"{args.output}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(dictionary, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, args.output)
+    print(json.dumps({"output": args.output, "vocabulary": len(vocabulary), "languages": len(dictionary)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
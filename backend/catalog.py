@@ -0,0 +1,164 @@
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from types import MappingProxyType
+
+from search_index import SearchIndex
+
+PLANT_DATA_PATH = os.getenv("PLANT_DATA_PATH", os.path.join("data", "plant_data.json"))
+PLANT_ALIASES_PATH = os.getenv("PLANT_ALIASES_PATH", os.path.join("data", "plant_aliases.json"))
+CATALOG_RELOAD_INTERVAL_S = float(os.getenv("CATALOG_RELOAD_INTERVAL_S", "1"))
+
+
+def normalize_name(name):
+    # "Aloe vera", "aloe_vera" and "ALOEVERA" all resolve to the same entry
+    return re.sub(r"[^0-9a-z]+", "", str(name).casefold())
+
+
+class CatalogSnapshot:
+
+    def __init__(self, entries, aliases, search_index, version, mtime, load_ms):
+        self.entries = MappingProxyType(entries)
+        self.aliases = MappingProxyType(aliases)
+        self.search_index = search_index
+        self.version = version
+        self.mtime = mtime
+        self.load_ms = load_ms
+        self.loaded_at = time.time()
+
+    def resolve(self, name):
+        if name in self.entries:
+            return name
+        return self.aliases.get(normalize_name(name))
+
+    def get(self, name):
+        label = self.resolve(name)
+        # MappingProxyType only guards the top level; callers get their own copy of the nested lists and dicts
+        return copy.deepcopy(self.entries[label]) if label is not None else None
+
+    def search(self, query, limit=10, prefix=True):
+        return self.search_index.search(query, limit, prefix)
+
+
+def build_aliases(entries, extra_aliases):
+    aliases, ambiguous = {}, set()
+
+    def add(alias, label):
+        key = normalize_name(alias)
+        if not key or key in ambiguous:
+            return
+        if aliases.get(key, label) != label:
+            # Two plants share this name (e.g. a scientific name), so neither gets it
+            ambiguous.add(key)
+            del aliases[key]
+            return
+        aliases[key] = label
+
+    for label, info in entries.items():
+        add(label, label)
+    for label, info in entries.items():
+        if isinstance(info, dict) and isinstance(info.get("scientific_name"), str):
+            add(info["scientific_name"], label)
+    for alias, label in extra_aliases.items():
+        if label in entries:
+            aliases[normalize_name(alias)] = label
+    return aliases
+
+
+def load_snapshot(path, aliases_path, mtime):
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        raw = f.read()
+    entries = json.loads(raw.decode("utf-8"))
+
+    extra_aliases = {}
+    if aliases_path and os.path.exists(aliases_path):
+        with open(aliases_path, "r", encoding="utf-8") as f:
+            extra_aliases = json.load(f)
+
+    return CatalogSnapshot(
+        entries,
+        build_aliases(entries, extra_aliases),
+        SearchIndex(entries),
+        hashlib.sha256(raw).hexdigest()[:16],
+        mtime,
+        (time.perf_counter() - started) * 1000.0,
+    )
+
+
+class PlantCatalog:
+
+    def __init__(self, path=PLANT_DATA_PATH, aliases_path=PLANT_ALIASES_PATH, reload_interval=CATALOG_RELOAD_INTERVAL_S):
+        self.path = path
+        self.aliases_path = aliases_path
+        self.reload_interval = reload_interval
+        self.reloads = 0
+        self._reload_lock = threading.Lock()
+        self._next_check = 0.0
+        self._snapshot = None
+
+    def _source_mtime(self):
+        mtime = os.path.getmtime(self.path)
+        if self.aliases_path and os.path.exists(self.aliases_path):
+            mtime = max(mtime, os.path.getmtime(self.aliases_path))
+        return mtime
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check and self._snapshot is not None:
+            return
+        # Readers never wait: whoever loses the race keeps serving the current snapshot
+        if not self._reload_lock.acquire(blocking=self._snapshot is None):
+            return
+        try:
+            self._next_check = now + self.reload_interval
+            current = self._snapshot
+            # Taken before reading, so a write that lands mid-load triggers another reload
+            mtime = self._source_mtime()
+            if current is not None and mtime == current.mtime:
+                return
+            snapshot = load_snapshot(self.path, self.aliases_path, mtime)
+            # A single reference swap publishes the new index atomically
+            self._snapshot = snapshot
+            self.reloads += 1
+            print(f"[Catalog] Loaded {len(snapshot.entries)} plants in {snapshot.load_ms:.1f} ms (version {snapshot.version})")
+        except Exception as e:
+            print(f"[Catalog Error] Keeping previous catalog: {e}")
+        finally:
+            self._reload_lock.release()
+
+    def snapshot(self):
+        self._maybe_reload()
+        return self._snapshot
+
+    def get(self, name):
+        snapshot = self.snapshot()
+        return snapshot.get(name) if snapshot is not None else None
+
+    def search(self, query, limit=10, prefix=True):
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return [], []
+        return snapshot.search(query, limit, prefix)
+
+    def stats(self):
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return {"path": self.path, "entries": 0, "reloads": self.reloads}
+        return {
+            "path": self.path,
+            "entries": len(snapshot.entries),
+            "aliases": len(snapshot.aliases),
+            "search_terms": len(snapshot.search_index.postings),
+            "version": snapshot.version,
+            "load_ms": round(snapshot.load_ms, 3),
+            "loaded_at": snapshot.loaded_at,
+            "reloads": self.reloads,
+        }
+
+
+plant_catalog = PlantCatalog()
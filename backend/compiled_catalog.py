@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import threading
+
+from metrics import Counters
+from translate import translate_plant_info_with_status
+
+COMPILED_CATALOG_PATH = os.getenv("COMPILED_CATALOG_PATH", os.path.join("data", "plant_catalog_compiled.json"))
+CATALOG_LANGUAGES = os.getenv("CATALOG_LANGUAGES", "hi,te,ta,kn,ml,bn,gu,mr,ur,fr,es,de,zh-cn,ja")
+CATALOG_FORMAT = 1
+
+catalog_counters = Counters("compiled_hits", "live_translations")
+_catalog = {"mtime": None, "data": None}
+_catalog_lock = threading.Lock()
+
+
+def source_digest(info):
+    canonical = json.dumps(info, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def configured_languages():
+    return [lang.strip() for lang in CATALOG_LANGUAGES.split(",") if lang.strip() and lang.strip() != "en"]
+
+
+def read_compiled_catalog(path=COMPILED_CATALOG_PATH):
+    if not os.path.exists(path):
+        return {"format": CATALOG_FORMAT, "languages": [], "sources": {}, "entries": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("format") != CATALOG_FORMAT:
+        print(f"[Compiled Catalog Warning] Ignoring {path}: unknown format {data.get('format')}")
+        return {"format": CATALOG_FORMAT, "languages": [], "sources": {}, "entries": {}}
+    return data
+
+
+def write_compiled_catalog(data, path=COMPILED_CATALOG_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def get_compiled_catalog():
+    try:
+        mtime = os.stat(COMPILED_CATALOG_PATH).st_mtime
+    except OSError:
+        return None
+    if _catalog["mtime"] != mtime:
+        with _catalog_lock:
+            if _catalog["mtime"] != mtime:
+                try:
+                    _catalog["data"] = read_compiled_catalog()
+                    _catalog["mtime"] = mtime
+                except Exception as e:
+                    print(f"[Compiled Catalog Error] {e}")
+    return _catalog["data"]
+
+
+def get_compiled_catalog_version():
+    get_compiled_catalog()
+    return str(_catalog["mtime"] or 0)
+
+
+def get_compiled_entry(label, english_info, target_lang):
+    catalog = get_compiled_catalog()
+    if catalog is None:
+        return None
+    entry = catalog["entries"].get(label, {}).get(target_lang)
+    # Entries compiled from an older English source are stale and get translated live
+    if entry is not None and catalog["sources"].get(label) == source_digest(english_info):
+        return entry
+    return None
+
+
+def get_translated_plant_info(label, english_info, target_lang):
+    if target_lang == "en" or not english_info:
+        return english_info, []
+
+    entry = get_compiled_entry(label, english_info, target_lang)
+    if entry is not None:
+        catalog_counters.incr("compiled_hits")
+        return entry, []
+
+    catalog_counters.incr("live_translations")
+    return translate_plant_info_with_status(english_info, target_lang)
+
+
+def get_catalog_stats():
+    catalog = get_compiled_catalog()
+    return {
+        **catalog_counters.snapshot(),
+        "path": COMPILED_CATALOG_PATH,
+        "plants": len(catalog["entries"]) if catalog else 0,
+        "languages": catalog["languages"] if catalog else [],
+    }
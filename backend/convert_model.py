@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import statistics
+import time
+
+import numpy as np
+
+from identify import CLASS_LABELS, IMAGE_SIZE, MODEL_PATH, SAVEDMODEL_PATH, preprocess_image_bytes
+from metrics import LatencyStats
+from tflite_model import TFLiteModel
+from savedmodel_model import export_savedmodel
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+QUANTIZATIONS = ("dynamic", "int8")
+
+
+def default_output_path(quantization):
+    return os.path.join("model", f"medicinal_plants_xception_{quantization}.tflite")
+
+
+def list_images(folder, limit=None):
+    paths = []
+    for root, _, files in os.walk(folder):
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    paths.sort()
+    return paths[:limit] if limit else paths
+
+
+def load_image(path):
+    with open(path, "rb") as f:
+        return preprocess_image_bytes(f.read())
+
+
+def load_keras_model(standin=False):
+    if standin:
+        import standin_model
+        return standin_model.load_xception_standin()
+
+    import tensorflow as tf
+    from download_model import download_model
+    download_model()
+    return tf.keras.models.load_model(MODEL_PATH, compile=False)
+
+
+def convert(keras_model, quantization, calibration_dir, calibration_samples):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if quantization == "int8":
+        calibration = list_images(calibration_dir, calibration_samples)
+        if not calibration:
+            raise SystemExit(f"No calibration images found in {calibration_dir}")
+        print(f"Calibrating with {len(calibration)} images from {calibration_dir}")
+
+        def representative_dataset():
+            for path in calibration:
+                yield [np.expand_dims(load_image(path), axis=0)]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+        converter.inference_output_type = tf.uint8
+
+    return converter.convert()
+
+
+def load_eval_set(eval_dir, limit):
+    samples = []
+    for label in CLASS_LABELS:
+        class_dir = os.path.join(eval_dir, label)
+        if os.path.isdir(class_dir):
+            samples.extend((path, label) for path in list_images(class_dir, limit))
+    return samples
+
+
+def evaluate(model, samples, warmup=3):
+    latency = LatencyStats(window=len(samples) or 1)
+    timings = []
+    per_class = {label: {"correct": 0, "total": 0} for label in CLASS_LABELS}
+    predictions = []
+    correct = 0
+
+    if samples:
+        # Untimed runs so graph tracing and allocator warm-up stay out of the first timings
+        batch = np.expand_dims(load_image(samples[0][0]), axis=0)
+        for _ in range(warmup):
+            model.predict_on_batch(batch)
+
+    for path, expected in samples:
+        batch = np.expand_dims(load_image(path), axis=0)
+        started = time.perf_counter()
+        row = np.asarray(model.predict_on_batch(batch))[0]
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        latency.record(elapsed_ms)
+        timings.append(elapsed_ms)
+
+        predicted = CLASS_LABELS[int(np.argmax(row))]
+        predictions.append(predicted)
+        if expected is not None:
+            per_class[expected]["total"] += 1
+            if predicted == expected:
+                per_class[expected]["correct"] += 1
+                correct += 1
+
+    summary = {**latency.summary(), "median": round(statistics.median(timings), 3) if timings else 0.0}
+    return predictions, correct, per_class, summary
+
+
+def report(args):
+    keras_model = load_keras_model(args.standin)
+
+    if args.eval_dir:
+        samples = load_eval_set(args.eval_dir, args.per_class)
+        reference = "labels"
+    else:
+        samples = [(path, None) for path in list_images(args.calibration_dir, args.limit)]
+        reference = "keras_predictions"
+    if not samples:
+        raise SystemExit("No evaluation images found")
+
+    keras_predictions, keras_correct, keras_classes, keras_latency = evaluate(keras_model, samples, args.warmup)
+    if reference == "keras_predictions":
+        samples = [(path, label) for (path, _), label in zip(samples, keras_predictions)]
+        keras_correct = len(samples)
+        for label in keras_predictions:
+            keras_classes[label]["total"] += 1
+            keras_classes[label]["correct"] += 1
+
+    runtimes = {"keras_h5": {
+        "accuracy": round(keras_correct / len(samples), 4),
+        "latency_ms": keras_latency,
+        "size_bytes": os.path.getsize(MODEL_PATH) if os.path.exists(MODEL_PATH) and not args.standin else None,
+    }}
+
+    per_class = {label: {"keras_h5": keras_classes[label]} for label in CLASS_LABELS}
+    for quantization in QUANTIZATIONS:
+        path = default_output_path(quantization)
+        if not os.path.exists(path):
+            print(f"Skipping {quantization}: {path} not found (run the convert command first)")
+            continue
+        _, tflite_correct, tflite_classes, tflite_latency = evaluate(TFLiteModel(path), samples, args.warmup)
+        runtimes[f"tflite_{quantization}"] = {
+            "accuracy": round(tflite_correct / len(samples), 4),
+            "latency_ms": tflite_latency,
+            "size_bytes": os.path.getsize(path),
+        }
+        for label in CLASS_LABELS:
+            per_class[label][f"tflite_{quantization}"] = tflite_classes[label]
+
+    result = {
+        "reference": reference,
+        "samples": len(samples),
+        "runtimes": runtimes,
+        "per_class": {label: stats for label, stats in per_class.items() if stats["keras_h5"]["total"]},
+    }
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the plant model to TensorFlow Lite or SavedModel and compare runtimes")
+    parser.add_argument("--standin", action="store_true", help="Use an untrained stand-in model instead of the .h5 weights")
+    parser.add_argument("--calibration-dir", default="uploads", help="Images used for int8 calibration")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="Write quantized .tflite models")
+    convert_parser.add_argument("--quantization", choices=QUANTIZATIONS + ("all",), default="all")
+    convert_parser.add_argument("--calibration-samples", type=int, default=200)
+
+    savedmodel_parser = subparsers.add_parser("savedmodel", help="Write a SavedModel with a traced serving signature")
+    savedmodel_parser.add_argument("--output", default=SAVEDMODEL_PATH)
+
+    report_parser = subparsers.add_parser("report", help="Accuracy versus latency of each runtime")
+    report_parser.add_argument("--eval-dir", help="Folder with one sub-folder of images per class label")
+    report_parser.add_argument("--per-class", type=int, default=None, help="Images per class to evaluate")
+    report_parser.add_argument("--limit", type=int, default=200,
+                               help="Images from --calibration-dir to compare against the .h5 when no --eval-dir is given")
+    report_parser.add_argument("--warmup", type=int, default=3, help="Untimed inferences per runtime before timing starts")
+    report_parser.add_argument("--output", help="Also write the JSON report to this file")
+
+    args = parser.parse_args()
+
+    if args.command == "report":
+        report(args)
+        return
+
+    keras_model = load_keras_model(args.standin)
+    if args.command == "savedmodel":
+        export_savedmodel(keras_model, args.output, IMAGE_SIZE)
+        print(f"Wrote {args.output}")
+        return
+
+    quantizations = QUANTIZATIONS if args.quantization == "all" else (args.quantization,)
+    for quantization in quantizations:
+        tflite_model = convert(keras_model, quantization, args.calibration_dir, args.calibration_samples)
+        path = default_output_path(quantization)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(tflite_model)
+        print(f"Wrote {path} ({len(tflite_model) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,207 @@
 # download_model.py
+import hashlib
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
 MODEL_URL = "https://drive.google.com/uc?export=download&id=1jt3wC0rqsP6qL49yOXh1cyrUlpN4eKPF"
 MODEL_PATH = os.path.join("model", "medicinal_plants_xception.h5")
+MODEL_SHA256 = os.getenv("MODEL_SHA256", "")
+
+CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_CONNECTIONS = int(os.getenv("MODEL_DOWNLOAD_CONNECTIONS", "4"))
+MIN_SEGMENT_SIZE = 8 * 1024 * 1024
+REQUEST_TIMEOUT = 30
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Progress:
+
+    def __init__(self, total, already=0, interval=2.0):
+        self.total = total
+        self.done = already
+        self.resumed = already
+        self.interval = interval
+        self.started = time.perf_counter()
+        self._last_report = self.started
+        self._lock = threading.Lock()
+
+    def advance(self, amount):
+        with self._lock:
+            self.done += amount
+            now = time.perf_counter()
+            if now - self._last_report >= self.interval:
+                self._last_report = now
+                self.report()
+
+    def throughput(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        return (self.done - self.resumed) / elapsed
+
+    def report(self):
+        percent = f"{100.0 * self.done / self.total:.1f}%" if self.total else "?"
+        print(f"⬇️ {self.done / 1e6:.1f} MB ({percent}) at {self.throughput() / 1e6:.2f} MB/s")
+
+
+def probe(url):
+    # A one-byte range request tells us the size and whether the server honours ranges
+    with requests.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=REQUEST_TIMEOUT) as r:
+        r.raise_for_status()
+        if r.status_code == 206:
+            content_range = r.headers.get("Content-Range", "")
+            total = content_range.rsplit("/", 1)[-1]
+            return (int(total) if total.isdigit() else None), True
+        length = r.headers.get("Content-Length")
+        return (int(length) if length and length.isdigit() else None), False
+
+
+def contiguous_prefix(state_path):
+    # A parallel run fills segments out of order; only the unbroken run of bytes from the start is usable
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            segments = json.load(f)["segments"]
+    except Exception:
+        return 0
+    prefix = 0
+    for start, end, done in sorted(segments):
+        if start != prefix:
+            break
+        prefix = start + done
+        if start + done <= end:
+            break
+    return prefix
+
+
+def download_sequential(url, part_path, total, supports_ranges):
+    state_path = f"{part_path}.json"
+    if os.path.exists(state_path):
+        # The .part was preallocated to full size by a parallel run, so its length says nothing about progress
+        prefix = contiguous_prefix(state_path) if supports_ranges and os.path.exists(part_path) else 0
+        if os.path.exists(part_path):
+            with open(part_path, "r+b") as f:
+                f.truncate(prefix)
+        os.remove(state_path)
+
+    offset = os.path.getsize(part_path) if supports_ranges and os.path.exists(part_path) else 0
+    if total and offset >= total:
+        return Progress(total, offset)
+
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    progress = Progress(total, offset)
+    if offset:
+        print(f"Resuming download at {offset / 1e6:.1f} MB")
 
-def download_model():
-    if not os.path.exists(MODEL_PATH):
-        os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-        print("⬇️ Downloading model from Google Drive...")
-        with requests.get(MODEL_URL, stream=True) as r:
+    with requests.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as r:
+        r.raise_for_status()
+        mode = "ab" if offset and r.status_code == 206 else "wb"
+        if mode == "wb":
+            progress = Progress(total, 0)
+        with open(part_path, mode) as f:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                progress.advance(len(chunk))
+    return progress
+
+
+def plan_segments(total, connections):
+    size = max(MIN_SEGMENT_SIZE, -(-total // connections))
+    return [[start, min(start + size, total) - 1, 0] for start in range(0, total, size)]
+
+
+def download_parallel(url, part_path, total, connections):
+    state_path = f"{part_path}.json"
+    segments = None
+    if os.path.exists(part_path) and os.path.exists(state_path):
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("total") == total and state.get("url") == url:
+                segments = state["segments"]
+        except Exception as e:
+            print(f"Ignoring unreadable download state: {e}")
+
+    if segments is None:
+        segments = plan_segments(total, connections)
+        with open(part_path, "wb") as f:
+            f.truncate(total)
+
+    progress = Progress(total, sum(segment[2] for segment in segments))
+    if progress.done:
+        print(f"Resuming download at {progress.done / 1e6:.1f} MB")
+    state_lock = threading.Lock()
+
+    def save_state():
+        with state_lock:
+            tmp_path = f"{state_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"url": url, "total": total, "segments": segments}, f)
+            os.replace(tmp_path, state_path)
+
+    def fetch(segment):
+        start, end, done = segment
+        if start + done > end:
+            return
+        headers = {"Range": f"bytes={start + done}-{end}"}
+        with requests.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as r:
             r.raise_for_status()
-            with open(MODEL_PATH, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
+            if r.status_code != 206:
+                raise IOError(f"Server ignored range request for bytes {start + done}-{end}")
+            with open(part_path, "r+b") as f:
+                f.seek(start + done)
+                for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
                     f.write(chunk)
-        print("✅ Model downloaded successfully.")
+                    segment[2] += len(chunk)
+                    progress.advance(len(chunk))
+                    save_state()
+
+    save_state()
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        for future in [executor.submit(fetch, segment) for segment in segments]:
+            future.result()
+
+    os.remove(state_path)
+    return progress
+
+
+def download_model(url=MODEL_URL, path=MODEL_PATH, expected_sha256=MODEL_SHA256, connections=DOWNLOAD_CONNECTIONS):
+    if os.path.exists(path):
+        if not expected_sha256 or sha256_file(path) == expected_sha256.lower():
+            print("✅ Model already exists. Skipping download.")
+            return path
+        print("⚠️ Existing model failed checksum verification. Downloading again.")
+        os.remove(path)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    part_path = f"{path}.part"
+    print("⬇️ Downloading model from Google Drive...")
+
+    total, supports_ranges = probe(url)
+    if supports_ranges and total and connections > 1 and total >= 2 * MIN_SEGMENT_SIZE:
+        progress = download_parallel(url, part_path, total, connections)
     else:
-        print("✅ Model already exists. Skipping download.")
+        progress = download_sequential(url, part_path, total, supports_ranges)
+
+    size = os.path.getsize(part_path)
+    if total and size != total:
+        raise IOError(f"Model download incomplete: {size} of {total} bytes")
+
+    if expected_sha256:
+        actual = sha256_file(part_path)
+        if actual != expected_sha256.lower():
+            os.remove(part_path)
+            raise IOError(f"Model checksum mismatch: expected {expected_sha256}, got {actual}")
+
+    os.replace(part_path, path)
+    print(f"✅ Model downloaded successfully ({size / 1e6:.1f} MB at {progress.throughput() / 1e6:.2f} MB/s).")
+    return path
@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+INITIAL_CAPACITY = 1024
+PROJECTION_SEED = 0
+
+
+class EmbeddingIndex:
+
+    def __init__(self, folder, dim=256):
+        self.folder = folder
+        self.vectors_path = os.path.join(folder, "vectors.f16")
+        self.ids_path = os.path.join(folder, "ids.jsonl")
+        self.meta_path = os.path.join(folder, "meta.json")
+        self.dim = dim
+        self.input_dim = None
+        self.entries = []
+        self._positions = {}
+        self._keys = {}
+        self._projection = None
+        self._matrix = None
+        self._dense = None
+        self._capacity = 0
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.dim = meta["dim"]
+            self.input_dim = meta["input_dim"]
+
+        if os.path.exists(self.ids_path):
+            with open(self.ids_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        entry = json.loads(line)
+                        self._remember(entry, len(self.entries))
+                        self.entries.append(entry)
+
+        if self.input_dim and os.path.exists(self.vectors_path):
+            capacity = os.path.getsize(self.vectors_path) // (self.dim * 2)
+            # Rows whose id line never made it to disk are ignored and overwritten
+            self.entries = self.entries[:capacity]
+            self._positions = {}
+            self._keys = {}
+            for position, entry in enumerate(self.entries):
+                self._remember(entry, position)
+            self._open(capacity)
+            # Queries scan this float32 copy of the used rows; numpy has no BLAS path for float16
+            self._dense = np.array(self._matrix[:len(self.entries)], dtype=np.float32)
+
+    def _remember(self, entry, position):
+        self._positions[entry["id"]] = position
+        if entry.get("key"):
+            self._keys[entry["key"]] = position
+
+    def _open(self, capacity):
+        self._matrix = np.memmap(self.vectors_path, dtype=np.float16, mode="r+", shape=(capacity, self.dim))
+        self._capacity = capacity
+
+    def _grow(self, needed):
+        capacity = max(INITIAL_CAPACITY, self._capacity)
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self._capacity:
+            return
+        if self._matrix is not None:
+            self._matrix.flush()
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(capacity * self.dim * 2)
+        self._open(capacity)
+
+    def _project(self, vector):
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        if self.input_dim is None:
+            self.input_dim = int(vector.shape[0])
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": self.dim, "input_dim": self.input_dim}, f)
+        if vector.shape[0] != self.input_dim:
+            raise ValueError(f"Embedding has {vector.shape[0]} dimensions, index expects {self.input_dim}")
+
+        if self.input_dim > self.dim:
+            if self._projection is None:
+                # Seeded Gaussian random projection approximately preserves cosine similarity
+                rng = np.random.default_rng(PROJECTION_SEED)
+                self._projection = rng.standard_normal((self.input_dim, self.dim), dtype=np.float32)
+            vector = vector @ self._projection
+        elif self.input_dim < self.dim:
+            vector = np.pad(vector, (0, self.dim - self.input_dim))
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, entry_id):
+        position = self._positions.get(entry_id)
+        if position is None:
+            return None
+        return self.entries[position]
+
+    def _store(self, entry, vector):
+        position = len(self.entries)
+        self._grow(position + 1)
+        self._matrix[position] = vector
+        self._matrix.flush()
+        if self._dense is None or position >= self._dense.shape[0]:
+            # Grows with the entries rather than the file; 25% headroom keeps appends amortized O(1)
+            dense = np.empty((position + max(INITIAL_CAPACITY, position // 4), self.dim), dtype=np.float32)
+            if self._dense is not None:
+                dense[:position] = self._dense[:position]
+            self._dense = dense
+        self._dense[position] = self._matrix[position]
+        with open(self.ids_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._remember(entry, position)
+        self.entries.append(entry)
+
+    def append(self, entry, vector):
+        with self._lock:
+            self._store(entry, self._project(vector))
+
+    def append_duplicate(self, entry, key):
+        # Reuses the vector stored for an earlier upload of the same image bytes
+        with self._lock:
+            position = self._keys.get(key)
+            if position is None:
+                return False
+            self._store(entry, np.array(self._matrix[position]))
+            return True
+
+    def _search(self, query, k, exclude):
+        count = len(self.entries)
+        dense = self._dense
+        if dense is None or count == 0:
+            return []
+
+        scores = dense[:count] @ query
+        if exclude is not None and exclude < count:
+            scores[exclude] = -np.inf
+
+        k = min(k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {**self.entries[i], "similarity": round(float(scores[i]), 4)}
+            for i in top if np.isfinite(scores[i])
+        ]
+
+    def query(self, vector, k=5):
+        if self.input_dim is None:
+            return []
+        with self._lock:
+            query = self._project(vector)
+        return self._search(query, k, None)
+
+    def query_by_id(self, entry_id, k=5):
+        position = self._positions.get(entry_id)
+        if position is None:
+            return None
+        return self._search(self._dense[position].copy(), k, position)
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "dim": self.dim,
+            "input_dim": self.input_dim,
+            "capacity": self._capacity,
+            "memory_bytes": self._dense.nbytes if self._dense is not None else 0,
+        }
@@ -1,13 +1,59 @@
+import io
+import json
+import multiprocessing as mp
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing import image
+from PIL import Image
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from download_model import download_model
+from batcher import InferenceBatcher
+from inference_pool import InferencePool
+from tflite_model import TFLiteModel
+from savedmodel_model import SavedModelRunner
+from prediction_cache import PredictionCache, make_cache_key
+from metrics import Counters, LatencyStats
+from embedding_index import EmbeddingIndex
 
 MODEL_PATH = os.path.join('model', 'medicinal_plants_xception.h5')
+TFLITE_MODEL_PATH = os.getenv("TFLITE_MODEL_PATH", os.path.join('model', 'medicinal_plants_xception_dynamic.tflite'))
+SAVEDMODEL_PATH = os.getenv("SAVEDMODEL_PATH", os.path.join('model', 'medicinal_plants_xception_savedmodel'))
+TF_CONFIG_PATH = os.getenv("TF_CONFIG_PATH", os.path.join('model', 'tf_config.json'))
+IMAGE_SIZE = (224, 224)
+
+INFERENCE_RUNTIME = os.getenv("INFERENCE_RUNTIME", "keras")
+TFLITE_THREADS = int(os.getenv("TFLITE_THREADS", "0"))
+
+INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "0") == "1"
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "10"))
+
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+# Split the cores between worker processes so N TensorFlow thread pools do not oversubscribe the CPU
+INFERENCE_WORKER_THREADS = int(os.getenv(
+    "INFERENCE_WORKER_THREADS", str(max(1, (os.cpu_count() or 1) // max(1, INFERENCE_WORKERS)))
+))
+INFERENCE_MAX_RESTARTS = int(os.getenv("INFERENCE_MAX_RESTARTS", "5"))
+INFERENCE_RESTART_BACKOFF = float(os.getenv("INFERENCE_RESTART_BACKOFF", "1.0"))
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", "30"))
+
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "1024"))
+PREDICTION_CACHE_DIR = os.getenv("PREDICTION_CACHE_DIR", "")
+MODEL_VERSION = os.getenv("MODEL_VERSION", "")
+
+CASCADE_MODEL_PATH = os.getenv("CASCADE_MODEL_PATH", "")
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", "0.9"))
+
+EMBEDDING_INDEX_DIR = os.getenv("EMBEDDING_INDEX_DIR", "")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "256"))
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.98"))
+
+EAGER_MODEL_LOAD = os.getenv("EAGER_MODEL_LOAD", "0") == "1"
+WARMUP_BATCHES = int(os.getenv("WARMUP_BATCHES", "2"))
+WARMUP_BATCH_SIZES = os.getenv("WARMUP_BATCH_SIZES", "")
 
 CLASS_LABELS = [
     "Aloevera", "Amla", "Amruta_Balli", "Arali", "Ashoka", "Astma_weed", "Badipala", "Balloon_Vine", "Bamboo", "Beans",
@@ -21,39 +67,444 @@ CLASS_LABELS = [
     "Spinach1", "Tamarind", "Taro", "Tecoma", "Thumbe", "Tomato", "Tulasi", "Turmeric"
 ]
 
+tf = None
+startup_timings = {}
 model = None
+_model_lock = threading.Lock()
+model_ready = threading.Event()
+warmup_status = {"state": "pending", "seconds": None, "error": None}
+batcher = None
+_batcher_lock = threading.Lock()
+inference_pool = None
+_pool_lock = threading.Lock()
+cascade_model = None
+_cascade_lock = threading.Lock()
+embedding_model = None
+embedding_index = None
+_embedding_lock = threading.Lock()
+_embedding_index_lock = threading.Lock()
+embedding_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-index")
+cascade_counters = Counters("answered", "escalated")
+cascade_latency_ms = LatencyStats()
+full_model_latency_ms = LatencyStats()
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_DIR)
+
+def import_tensorflow():
+    
+    global tf
+    if tf is None:
+        started = time.perf_counter()
+        import tensorflow
+        startup_timings["tensorflow_import_s"] = round(time.perf_counter() - started, 3)
+        # Thread pools are fixed by the first op, which may be the cascade model, so tune them right away.
+        # Pool workers size their own threads; the tuned values are for one process owning the machine
+        if tf_config and mp.parent_process() is None:
+            apply_tf_config(tensorflow, tf_config)
+        tf = tensorflow
+    return tf
+
+def record_first_inference(started):
+    if "first_inference_s" in startup_timings:
+        return
+    startup_timings["first_inference_s"] = round(time.perf_counter() - started, 3)
+    breakdown = ", ".join(f"{name} {seconds}s" for name, seconds in startup_timings.items())
+    print(f"[Startup] {breakdown}")
+
+def load_tf_config():
+    if not os.path.exists(TF_CONFIG_PATH):
+        return {}
+    try:
+        with open(TF_CONFIG_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[TF Config Error] {TF_CONFIG_PATH}: {e}")
+        return {}
+
+tf_config = load_tf_config()
+if "BATCH_MAX_SIZE" not in os.environ and tf_config.get("batch_size"):
+    # The batch size the autotuner measured its best threading config at becomes the batcher's limit
+    BATCH_MAX_SIZE = int(tf_config["batch_size"])
+
+def apply_tf_config(tf, config):
+    try:
+        if config.get("intra_op"):
+            tf.config.threading.set_intra_op_parallelism_threads(config["intra_op"])
+        if config.get("inter_op"):
+            tf.config.threading.set_inter_op_parallelism_threads(config["inter_op"])
+        print(f"Applied TensorFlow config from {TF_CONFIG_PATH}: {config}")
+    except RuntimeError as e:
+        # Thread pools are fixed once TensorFlow has initialised
+        print(f"[TF Config Warning] Could not apply thread settings: {e}")
 
 def load_model_if_needed():
     
     global model
-    if model is None:
+    if model is not None:
+        return
+    with _model_lock:
+        if model is not None:
+            return
         try:
-            download_model()  # Ensure model file is present
+            started = time.perf_counter()
+            if INFERENCE_RUNTIME == "tflite":
+                model = TFLiteModel(TFLITE_MODEL_PATH, num_threads=TFLITE_THREADS or None)
+                startup_timings["model_load_s"] = round(time.perf_counter() - started, 3)
+                print(f"TFLite model loaded from {TFLITE_MODEL_PATH}")
+                return
+
+            tf = import_tensorflow()
+
             physical_devices = tf.config.list_physical_devices('GPU')
             if physical_devices:
                 for device in physical_devices:
                     tf.config.experimental.set_memory_growth(device, True)
-            
+
+            started = time.perf_counter()
+            if INFERENCE_RUNTIME == "savedmodel":
+                model = SavedModelRunner(SAVEDMODEL_PATH)
+                startup_timings["model_load_s"] = round(time.perf_counter() - started, 3)
+                print(f"SavedModel loaded from {SAVEDMODEL_PATH}")
+                return
+
+            download_model()  # Ensure model file is present
+            started = time.perf_counter()
             model = tf.keras.models.load_model(MODEL_PATH, compile=False)
+            model.compile(jit_compile=bool(tf_config.get("xla", False)))
+            startup_timings["model_load_s"] = round(time.perf_counter() - started, 3)
             print("Model loaded successfully!")
         except Exception as e:
             print(f"Error loading model: {e}")
             raise
 
-def predict_plant(image_path):
+def preprocess_image_bytes(data):
+    
+    img = Image.open(io.BytesIO(data))
+    if img.format == "JPEG":
+        # Let libjpeg scale down by 1/2..1/8 while decoding large photos. Pixels differ slightly
+        # from keras load_img (mean abs ~0.02 on the 0..1 scale); tests/test_preprocess.py checks top-1
+        img.draft("RGB", IMAGE_SIZE)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if img.size != IMAGE_SIZE:
+        img = img.resize(IMAGE_SIZE, Image.NEAREST)
+    return np.asarray(img, dtype=np.float32) / 255.0
+
+def predict_batch(img_arrays):
+    
+    load_model_if_needed()
+
+    started = time.perf_counter()
+    predictions = np.asarray(model.predict_on_batch(img_arrays))
+    record_first_inference(started)
+    results = []
+    for row in predictions:
+        predicted_index = int(np.argmax(row))
+        results.append((CLASS_LABELS[predicted_index], float(row[predicted_index])))
+    return results
+
+def embeddings_enabled():
+    return bool(EMBEDDING_INDEX_DIR) and INFERENCE_RUNTIME == "keras" and INFERENCE_WORKERS == 0
+
+if EMBEDDING_INDEX_DIR and not embeddings_enabled():
+    print("[Embedding Index Warning] Embeddings need INFERENCE_RUNTIME=keras and INFERENCE_WORKERS=0; index disabled.")
+
+def find_embedding_layer(keras_model):
+    for layer in reversed(keras_model.layers[:-1]):
+        if len(layer.output.shape) == 2:
+            return layer
+    raise ValueError("Model has no flat penultimate layer to take embeddings from")
+
+def get_embedding_index():
+    
+    global embedding_index
+    with _embedding_index_lock:
+        if embedding_index is None:
+            embedding_index = EmbeddingIndex(EMBEDDING_INDEX_DIR, EMBEDDING_DIM)
+            print(f"Embedding index loaded with {len(embedding_index)} entries")
+    return embedding_index
+
+def load_embedding_model_if_needed():
+    
+    global embedding_model
+    if embedding_model is not None:
+        return
+    load_model_if_needed()
+    with _embedding_lock:
+        if embedding_model is not None:
+            return
+        tf = import_tensorflow()
+        layer = find_embedding_layer(model)
+        # One forward pass yields both the penultimate activations and the class scores
+        embedding_model = tf.keras.Model(model.inputs, [layer.output, model.output])
+        get_embedding_index()
+        print(f"Embedding model ready from layer '{layer.name}'")
+
+def predict_batch_with_embeddings(img_arrays):
+    
+    load_embedding_model_if_needed()
+
+    started = time.perf_counter()
+    embeddings, predictions = embedding_model.predict_on_batch(img_arrays)
+    record_first_inference(started)
+    embeddings = np.asarray(embeddings)
+    predictions = np.asarray(predictions)
+    results = []
+    for embedding, row in zip(embeddings, predictions):
+        predicted_index = int(np.argmax(row))
+        results.append((CLASS_LABELS[predicted_index], float(row[predicted_index]), embedding))
+    return results
+
+def find_similar(entry_id, k=5):
+    if not embeddings_enabled():
+        return None
+    return get_embedding_index().query_by_id(entry_id, k)
+
+def embed_and_index(entry, data, img_array):
+    try:
+        if img_array is None:
+            img_array = preprocess_image_bytes(data)
+        embedding = predict_batch_with_embeddings(np.expand_dims(img_array, axis=0))[0][2]
+        embedding_index.append(entry, embedding)
+    except Exception as e:
+        print(f"[Embedding Index Error] {entry['id']}: {e}")
+
+def index_upload(index_entry, result, data, cache_key, embedding=None, img_array=None):
+    # Every identified upload gets a vector so /similar/<id> works whichever stage answered
+    entry = {**index_entry, "label": result[0], "confidence": result[1], "key": cache_key}
+    if embedding is not None:
+        embedding_index.append(entry, embedding)
+    elif not get_embedding_index().append_duplicate(entry, cache_key):
+        # Cascade answers have no embedding; the Xception pass for it runs after the response
+        embedding_executor.submit(embed_and_index, entry, data, img_array)
+
+def get_batcher():
+    
+    global batcher
+    with _batcher_lock:
+        if batcher is None:
+            predict_fn = predict_batch_with_embeddings if embeddings_enabled() else predict_batch
+            batcher = InferenceBatcher(predict_fn, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS)
+    return batcher
+
+def load_worker_model():
+    load_model_if_needed()
+    return model
+
+def get_inference_pool():
+    
+    global inference_pool
+    with _pool_lock:
+        if inference_pool is None:
+            inference_pool = InferencePool(
+                INFERENCE_WORKERS,
+                load_worker_model,
+                intra_op_threads=INFERENCE_WORKER_THREADS,
+                max_batch_size=BATCH_MAX_SIZE,
+                max_restarts=INFERENCE_MAX_RESTARTS,
+                restart_backoff=INFERENCE_RESTART_BACKOFF,
+                submit_timeout=INFERENCE_TIMEOUT,
+            )
+    return inference_pool
+
+def get_pool_error():
+    if inference_pool is not None and inference_pool.failed:
+        return inference_pool.last_error
+    return None
+
+def get_warmup_batch_sizes():
+    if WARMUP_BATCH_SIZES:
+        return sorted({int(size) for size in WARMUP_BATCH_SIZES.split(",") if size.strip()})
+    sizes = {1}
+    if INFERENCE_BATCHING:
+        sizes.add(BATCH_MAX_SIZE)
+    return sorted(sizes)
+
+def warm_up_model():
+    
+    started = time.perf_counter()
+    warmup_status["state"] = "warming_up"
+    try:
+        if CASCADE_MODEL_PATH:
+            for _ in range(WARMUP_BATCHES):
+                predict_cascade(np.zeros(IMAGE_SIZE + (3,), dtype=np.float32))
+
+        if INFERENCE_WORKERS > 0:
+            pool = get_inference_pool()
+            dummy = np.zeros(IMAGE_SIZE + (3,), dtype=np.float32)
+            with ThreadPoolExecutor(max_workers=INFERENCE_WORKERS) as executor:
+                list(executor.map(lambda _: pool.submit(dummy), range(WARMUP_BATCHES * INFERENCE_WORKERS)))
+        else:
+            load_model_if_needed()
+            for batch_size in get_warmup_batch_sizes():
+                dummy = np.zeros((batch_size,) + IMAGE_SIZE + (3,), dtype=np.float32)
+                for _ in range(WARMUP_BATCHES):
+                    predict_batch(dummy)
+        warmup_status["seconds"] = round(time.perf_counter() - started, 3)
+        warmup_status["state"] = "ready"
+        model_ready.set()
+        print(f"Model warm-up finished in {warmup_status['seconds']}s")
+    except Exception as e:
+        warmup_status["state"] = "failed"
+        warmup_status["error"] = str(e)
+        print(f"Error during model warm-up: {e}")
+
+def start_warmup():
+    if mp.parent_process() is not None:
+        # Spawned inference workers re-import the app module; they load their own model
+        return None
+    thread = threading.Thread(target=warm_up_model, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+def is_model_ready():
+    if get_pool_error():
+        return False
+    return model_ready.is_set() or not EAGER_MODEL_LOAD
+
+def load_cascade_model_if_needed():
+    
+    global cascade_model
+    if cascade_model is not None:
+        return
+    with _cascade_lock:
+        if cascade_model is not None:
+            return
+        try:
+            if CASCADE_MODEL_PATH.endswith(".tflite"):
+                cascade_model = TFLiteModel(CASCADE_MODEL_PATH, num_threads=TFLITE_THREADS or None)
+            else:
+                cascade_model = import_tensorflow().keras.models.load_model(CASCADE_MODEL_PATH, compile=False)
+            print(f"Cascade model loaded from {CASCADE_MODEL_PATH}")
+        except Exception as e:
+            print(f"Error loading cascade model: {e}")
+            raise
+
+def predict_cascade(img_array):
+    load_cascade_model_if_needed()
+    row = np.asarray(cascade_model.predict_on_batch(np.expand_dims(img_array, axis=0)))[0]
+    predicted_index = int(np.argmax(row))
+    return CLASS_LABELS[predicted_index], float(row[predicted_index])
+
+def predict_full(img_array):
+    if INFERENCE_WORKERS > 0:
+        predicted_index, confidence = get_inference_pool().submit(img_array)
+        return CLASS_LABELS[predicted_index], confidence
+    if INFERENCE_BATCHING:
+        return get_batcher().submit(img_array)
+    if embeddings_enabled():
+        return predict_batch_with_embeddings(np.expand_dims(img_array, axis=0))[0]
+    return predict_batch(np.expand_dims(img_array, axis=0))[0]
+
+def get_cascade_stats():
+    if not CASCADE_MODEL_PATH:
+        return None
+    counters = cascade_counters.snapshot()
+    total = counters["answered"] + counters["escalated"]
+    escalation_rate = counters["escalated"] / total if total else 0.0
+    cascade_ms = cascade_latency_ms.summary()
+    full_ms = full_model_latency_ms.summary()
+    # Every request pays for the cheap model; only escalations pay for Xception too
+    saved_ms = None
+    if full_ms["count"]:
+        saved_ms = round(full_ms["mean"] * (1.0 - escalation_rate) - cascade_ms["mean"], 3)
+    return {
+        **counters,
+        "threshold": CASCADE_THRESHOLD,
+        "escalation_rate": round(escalation_rate, 4),
+        "cascade_ms": cascade_ms,
+        "full_model_ms": full_ms,
+        "estimated_saved_ms_per_request": saved_ms,
+    }
+
+def get_active_model_path():
+    if INFERENCE_RUNTIME == "tflite":
+        return TFLITE_MODEL_PATH
+    if INFERENCE_RUNTIME == "savedmodel":
+        return SAVEDMODEL_PATH
+    return MODEL_PATH
+
+def get_model_version():
+    if MODEL_VERSION:
+        return MODEL_VERSION
+    versions = []
+    for model_path in filter(None, [get_active_model_path(), CASCADE_MODEL_PATH]):
+        try:
+            stat = os.stat(model_path)
+            versions.append(f"{os.path.basename(model_path)}:{stat.st_size}:{int(stat.st_mtime)}")
+        except OSError:
+            versions.append(os.path.basename(model_path))
+    if CASCADE_MODEL_PATH:
+        versions.append(f"threshold:{CASCADE_THRESHOLD}")
+    return "+".join(versions)
+
+def get_inference_stats():
+    return {
+        "runtime": INFERENCE_RUNTIME,
+        "startup": startup_timings,
+        "batching": INFERENCE_BATCHING,
+        "batcher": batcher.stats() if batcher is not None else None,
+        "worker_pool": inference_pool.stats() if inference_pool is not None else None,
+        "prediction_cache": prediction_cache.stats(),
+        "cascade": get_cascade_stats(),
+        "embedding_index": embedding_index.stats() if embedding_index is not None else None,
+    }
+
+def predict_plant_with_stage(image_data, index_entry=None):
     
     try:
-        load_model_if_needed()
+        if isinstance(image_data, (bytes, bytearray)):
+            data = bytes(image_data)
+        else:
+            with open(image_data, "rb") as f:
+                data = f.read()
 
-        img = image.load_img(image_path, target_size=(224, 224))
-        img_array = np.expand_dims(image.img_to_array(img) / 255.0, axis=0)
+        cache_key = make_cache_key(data, get_model_version())
+        cached = prediction_cache.get(cache_key)
+        if cached is not None:
+            if index_entry is not None and embeddings_enabled():
+                index_upload(index_entry, cached, data, cache_key)
+            return cached[0], cached[1], "cache"
 
-        predictions = model.predict(img_array)
-        predicted_index = np.argmax(predictions)
-        confidence = float(predictions[0][predicted_index])
-        label = CLASS_LABELS[predicted_index]
+        img_array = preprocess_image_bytes(data)
 
-        return label, confidence
+        stage = "xception"
+        result = None
+        if CASCADE_MODEL_PATH:
+            started = time.perf_counter()
+            label, confidence = predict_cascade(img_array)
+            cascade_latency_ms.record((time.perf_counter() - started) * 1000.0)
+            if confidence >= CASCADE_THRESHOLD:
+                cascade_counters.incr("answered")
+                stage = "cascade"
+                result = (label, confidence)
+            else:
+                cascade_counters.incr("escalated")
+
+        if result is None:
+            started = time.perf_counter()
+            result = predict_full(img_array)
+            full_model_latency_ms.record((time.perf_counter() - started) * 1000.0)
+
+        if len(result) == 3:
+            label, confidence, embedding = result
+            result = (label, confidence)
+            if NEAR_DUPLICATE_THRESHOLD > 0:
+                matches = embedding_index.query(embedding, k=1)
+                if matches and matches[0]["similarity"] >= NEAR_DUPLICATE_THRESHOLD:
+                    # Re-encoded or re-cropped copies keep the answer already given for the original
+                    result = (matches[0]["label"], matches[0]["confidence"])
+                    stage = "near_duplicate"
+            if index_entry is not None:
+                index_upload(index_entry, result, data, cache_key, embedding)
+        elif index_entry is not None and embeddings_enabled():
+            index_upload(index_entry, result, data, cache_key, img_array=img_array)
+
+        prediction_cache.put(cache_key, result)
+        return result[0], result[1], stage
     except Exception as e:
         print(f"Error during prediction: {e}")
         raise
+
+def predict_plant(image_data):
+    label, confidence, _ = predict_plant_with_stage(image_data)
+    return label, confidence
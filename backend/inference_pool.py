@@ -0,0 +1,261 @@
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from metrics import Counters, LatencyStats
+
+SLOT_SHAPE = (224, 224, 3)
+SLOT_DTYPE = np.float32
+HEALTH_CHECK_INTERVAL = 1.0
+MAX_RESTART_BACKOFF = 60.0
+
+
+def _worker_main(worker_id, shm_name, num_slots, task_queue, result_queue, model_loader, intra_op_threads, max_batch_size):
+    shm = None
+    try:
+        if intra_op_threads:
+            import tensorflow as tf
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+            tf.config.threading.set_inter_op_parallelism_threads(1)
+
+        model = model_loader()
+        shm = shared_memory.SharedMemory(name=shm_name)
+        slots = np.ndarray((num_slots,) + SLOT_SHAPE, dtype=SLOT_DTYPE, buffer=shm.buf)
+        result_queue.put(("ready", worker_id, None, None))
+
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            tasks = [task]
+            while len(tasks) < max_batch_size:
+                try:
+                    task = task_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if task is None:
+                    task_queue.put(None)
+                    break
+                tasks.append(task)
+
+            try:
+                batch = slots[[slot for slot, _ in tasks]]
+                predictions = np.asarray(model.predict_on_batch(batch))
+                for (slot, seq), row in zip(tasks, predictions):
+                    index = int(np.argmax(row))
+                    result_queue.put(("result", slot, seq, (index, float(row[index]))))
+            except Exception as e:
+                for slot, seq in tasks:
+                    result_queue.put(("error", slot, seq, str(e)))
+    except Exception as e:
+        print(f"[Inference Worker {worker_id} Error] {e}")
+        raise
+    finally:
+        if shm is not None:
+            shm.close()
+
+
+class InferencePool:
+
+    def __init__(self, num_workers, model_loader, num_slots=None, intra_op_threads=0, max_batch_size=8,
+                 max_restarts=5, restart_backoff=1.0, submit_timeout=30.0):
+        self.num_workers = max(1, int(num_workers))
+        self.model_loader = model_loader
+        self.num_slots = int(num_slots or self.num_workers * 4)
+        self.intra_op_threads = int(intra_op_threads)
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_restarts = int(max_restarts)
+        self.restart_backoff = float(restart_backoff)
+        self.submit_timeout = float(submit_timeout) if submit_timeout else None
+        self._ctx = mp.get_context("spawn")
+
+        slot_bytes = int(np.prod(SLOT_SHAPE)) * np.dtype(SLOT_DTYPE).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=self.num_slots * slot_bytes)
+        self._slots = np.ndarray((self.num_slots,) + SLOT_SHAPE, dtype=SLOT_DTYPE, buffer=self._shm.buf)
+        self._free_slots = queue.Queue()
+        for slot in range(self.num_slots):
+            self._free_slots.put(slot)
+
+        self._result_queue = self._ctx.Queue()
+        self._processes = [None] * self.num_workers
+        self._task_queues = [None] * self.num_workers
+        self._inflight = [set() for _ in range(self.num_workers)]
+        # Consecutive crashes since the worker last reported ready; reset on "ready"
+        self._crashes = [0] * self.num_workers
+        self._restart_at = [None] * self.num_workers
+        self._given_up = [False] * self.num_workers
+        self.last_error = None
+        self._pending = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.counters = Counters("submitted", "completed", "failed", "restarts")
+        self.latency_ms = LatencyStats()
+
+        for worker_id in range(self.num_workers):
+            self._start_worker(worker_id)
+
+        threading.Thread(target=self._collect_results, name="inference-pool-results", daemon=True).start()
+        threading.Thread(target=self._monitor_workers, name="inference-pool-monitor", daemon=True).start()
+
+    def _start_worker(self, worker_id):
+        task_queue = self._task_queues[worker_id] or self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self._shm.name, self.num_slots, task_queue, self._result_queue,
+                  self.model_loader, self.intra_op_threads, self.max_batch_size),
+            name=f"inference-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        self._task_queues[worker_id] = task_queue
+        self._processes[worker_id] = process
+
+    @property
+    def failed(self):
+        return all(self._given_up)
+
+    def submit(self, img_array, timeout=None):
+        if self._closed:
+            raise RuntimeError("Inference pool is closed")
+        if self.failed:
+            raise RuntimeError(f"Inference pool unavailable: {self.last_error}")
+
+        timeout = self.submit_timeout if timeout is None else timeout
+        try:
+            slot = self._free_slots.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("Timed out waiting for a free inference slot")
+        self._slots[slot] = img_array
+        future = Future()
+        started = time.perf_counter()
+
+        with self._lock:
+            candidates = [w for w in range(self.num_workers) if not self._given_up[w]]
+            if not candidates:
+                self._free_slots.put(slot)
+                raise RuntimeError(f"Inference pool unavailable: {self.last_error}")
+            worker_id = min(candidates, key=lambda w: len(self._inflight[w]))
+            seq = next(self._seq)
+            self._pending[slot] = (seq, future, worker_id)
+            self._inflight[worker_id].add(slot)
+            self._task_queues[worker_id].put((slot, seq))
+        self.counters.incr("submitted")
+
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            with self._lock:
+                pending = self._pending.get(slot)
+                if pending is not None and pending[0] == seq:
+                    # A late result for this seq is ignored by the collector
+                    del self._pending[slot]
+                    self._inflight[worker_id].discard(slot)
+                    self._free_slots.put(slot)
+            self.counters.incr("failed")
+            raise TimeoutError(f"Inference timed out after {timeout}s")
+        finally:
+            self.latency_ms.record((time.perf_counter() - started) * 1000.0)
+
+    def _collect_results(self):
+        while not self._closed:
+            try:
+                kind, slot, seq, payload = self._result_queue.get(timeout=HEALTH_CHECK_INTERVAL)
+            except (queue.Empty, EOFError, OSError):
+                continue
+            if kind == "ready":
+                print(f"Inference worker {slot} ready")
+                self._crashes[slot] = 0
+                continue
+
+            with self._lock:
+                pending = self._pending.get(slot)
+                if pending is None or pending[0] != seq:
+                    continue
+                del self._pending[slot]
+                self._inflight[pending[2]].discard(slot)
+            self._free_slots.put(slot)
+
+            future = pending[1]
+            if kind == "result":
+                self.counters.incr("completed")
+                future.set_result(payload)
+            else:
+                self.counters.incr("failed")
+                future.set_exception(RuntimeError(payload))
+
+    def _monitor_workers(self):
+        while not self._closed:
+            time.sleep(HEALTH_CHECK_INTERVAL)
+            for worker_id, process in enumerate(self._processes):
+                if self._closed or self._given_up[worker_id]:
+                    continue
+                if process is not None and process.is_alive():
+                    continue
+
+                if process is not None:
+                    error = f"Inference worker {worker_id} exited with code {process.exitcode}"
+                    self.last_error = error
+                    self._crashes[worker_id] += 1
+                    give_up = self._crashes[worker_id] > self.max_restarts
+                    with self._lock:
+                        # The dead worker may have been mid-batch; fail its requests rather than replay them
+                        self._processes[worker_id] = None
+                        self._task_queues[worker_id] = None if give_up else self._ctx.Queue()
+                        self._given_up[worker_id] = give_up
+                        failed = [self._pending.pop(slot)[1] for slot in self._inflight[worker_id]
+                                  if slot in self._pending]
+                        for slot in self._inflight[worker_id]:
+                            self._free_slots.put(slot)
+                        self._inflight[worker_id].clear()
+                    for future in failed:
+                        self.counters.incr("failed")
+                        future.set_exception(RuntimeError(error))
+
+                    if give_up:
+                        print(f"[Inference Pool Error] {error}; giving up after {self.max_restarts} restarts")
+                        continue
+                    delay = min(self.restart_backoff * 2 ** (self._crashes[worker_id] - 1), MAX_RESTART_BACKOFF)
+                    self._restart_at[worker_id] = time.monotonic() + delay
+                    print(f"[Inference Pool] {error}; restarting in {delay:.1f}s")
+
+                if time.monotonic() >= self._restart_at[worker_id]:
+                    self.counters.incr("restarts")
+                    with self._lock:
+                        self._start_worker(worker_id)
+
+    def stats(self):
+        with self._lock:
+            inflight = [len(slots) for slots in self._inflight]
+        return {
+            **self.counters.snapshot(),
+            "workers": self.num_workers,
+            "alive": sum(1 for p in self._processes if p is not None and p.is_alive()),
+            "inflight": inflight,
+            "free_slots": self._free_slots.qsize(),
+            "given_up": sum(self._given_up),
+            "failed": self.failed,
+            "last_error": self.last_error,
+            "latency_ms": self.latency_ms.summary(),
+        }
+
+    def close(self):
+        self._closed = True
+        for task_queue in self._task_queues:
+            if task_queue is not None:
+                task_queue.put(None)
+        for process in self._processes:
+            if process is None:
+                continue
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._shm.close()
+        self._shm.unlink()
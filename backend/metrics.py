@@ -0,0 +1,58 @@
+import threading
+from collections import deque
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class LatencyStats:
+
+    def __init__(self, window=2048):
+        self._values = deque(maxlen=window)
+        self._count = 0
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, value):
+        with self._lock:
+            self._values.append(value)
+            self._count += 1
+            self._total += value
+
+    def summary(self):
+        with self._lock:
+            values = list(self._values)
+            count = self._count
+            total = self._total
+        return {
+            "count": count,
+            "mean": round(total / count, 3) if count else 0.0,
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "p99": round(percentile(values, 99), 3),
+            "max": round(max(values), 3) if values else 0.0,
+        }
+
+
+class Counters:
+
+    def __init__(self, *names):
+        self._values = {name: 0 for name in names}
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+
+    def get(self, name):
+        with self._lock:
+            return self._values.get(name, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
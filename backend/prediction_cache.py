@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from metrics import Counters
+
+
+def make_cache_key(data, model_version):
+    digest = hashlib.sha256()
+    digest.update(model_version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class PredictionCache:
+
+    def __init__(self, max_entries=1024, disk_dir=None):
+        self.max_entries = max(0, int(max_entries))
+        self.disk_dir = disk_dir or None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = Counters("memory_hits", "disk_hits", "misses", "stores", "evictions")
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _remember(self, key, value):
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters.incr("evictions")
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        if value is not None:
+            self.counters.incr("memory_hits")
+            return value
+
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                value = (entry["label"], float(entry["confidence"]))
+                self._remember(key, value)
+                self.counters.incr("disk_hits")
+                return value
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"[Prediction Cache Error] {key}: {e}")
+
+        self.counters.incr("misses")
+        return None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        self.counters.incr("stores")
+        if not self.disk_dir:
+            return
+        try:
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"label": value[0], "confidence": value[1]}, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[Prediction Cache Error] {key}: {e}")
+
+    def stats(self):
+        counters = self.counters.snapshot()
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        with self._lock:
+            size = len(self._entries)
+        return {
+            **counters,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "disk": bool(self.disk_dir),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,35 @@
+import numpy as np
+
+
+class SavedModelRunner:
+
+    def __init__(self, model_path, signature="serving_default"):
+        import tensorflow as tf
+
+        self.model_path = model_path
+        self._tf = tf
+        self._loaded = tf.saved_model.load(model_path)
+        # Calling the traced concrete function skips rebuilding Keras layers from HDF5
+        self._function = self._loaded.signatures[signature]
+        self._input_name = list(self._function.structured_input_signature[1].keys())[0]
+        self._output_name = list(self._function.structured_outputs.keys())[0]
+
+    def predict_on_batch(self, batch):
+        tensor = self._tf.constant(np.asarray(batch, dtype=np.float32))
+        return self._function(**{self._input_name: tensor})[self._output_name].numpy()
+
+
+def export_savedmodel(keras_model, path, image_size=(224, 224)):
+    import tensorflow as tf
+
+    spec = tf.TensorSpec([None, image_size[0], image_size[1], 3], tf.float32, name="image")
+
+    @tf.function(input_signature=[spec])
+    def serve(image):
+        return {"probabilities": keras_model(image, training=False)}
+
+    module = tf.Module()
+    module.model = keras_model
+    module.serve = serve
+    tf.saved_model.save(module, path, signatures={"serving_default": serve.get_concrete_function()})
+    return path
@@ -0,0 +1,154 @@
+import math
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+
+STOPWORDS = {"a", "an", "and", "as", "for", "in", "is", "of", "on", "or", "the", "to", "with"}
+SUFFIXES = ("ations", "ation", "ings", "ing", "ives", "ive", "ions", "ion", "ies", "es", "s", "ed", "ly")
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "family": 2.0,
+    "regions": 2.0,
+    "medicinal_uses": 1.5,
+    "properties": 1.5,
+    "description": 1.0,
+}
+MAX_PREFIX_EXPANSIONS = 50
+MAX_PHRASE_WORDS = 4
+
+
+def tokenize(text):
+    return [token for token in re.findall(r"[0-9a-z]+", str(text).casefold()) if token not in STOPWORDS]
+
+
+def stem(token):
+    # Deliberately light: "digestive" and "digestion" meet at "digest", short words are left alone
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            return token[:-len(suffix)]
+    return token
+
+
+def joined_phrases(tokens):
+    # "anti-inflammatory high" also yields "antiinflammatoryhigh", which matches an indexed property level
+    phrases = []
+    for size in range(2, MAX_PHRASE_WORDS + 1):
+        for start in range(len(tokens) - size + 1):
+            phrases.append("".join(tokens[start:start + size]))
+    return phrases
+
+
+def document_fields(label, info):
+    properties = info.get("properties") if isinstance(info.get("properties"), dict) else {}
+    return {
+        "name": [label.replace("_", " "), info.get("scientific_name", "")],
+        "family": [info.get("family", "")],
+        "regions": info.get("regions") or [],
+        "medicinal_uses": info.get("medicinal_uses") or [],
+        "properties": [f"{name} {value}" for name, value in properties.items()],
+        "description": [info.get("description", "")],
+    }, properties
+
+
+class SearchIndex:
+
+    def __init__(self, entries, k1=1.2, b=0.75):
+        self.labels = []
+        frequencies_by_term = defaultdict(dict)
+        stems = {}
+        self.surface_forms = defaultdict(set)
+        doc_lengths = []
+
+        for label, info in entries.items():
+            if not isinstance(info, dict):
+                continue
+            doc_id = len(self.labels)
+            self.labels.append(label)
+            fields, properties = document_fields(label, info)
+
+            length = 0.0
+            frequencies = defaultdict(float)
+            for field, values in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for value in values:
+                    if not isinstance(value, str):
+                        continue
+                    for token in tokenize(value):
+                        term = stems.get(token)
+                        if term is None:
+                            term = stems[token] = stem(token)
+                        self.surface_forms[token].add(term)
+                        frequencies[term] += weight
+                        length += weight
+            for name, value in properties.items():
+                if isinstance(value, str):
+                    # One term per property level, e.g. "antiinflammatoryhigh"
+                    frequencies["".join(tokenize(name)) + "".join(tokenize(value))] += FIELD_WEIGHTS["properties"]
+
+            for term, frequency in frequencies.items():
+                frequencies_by_term[term][doc_id] = frequency
+            doc_lengths.append(length)
+
+        # BM25 contributions are fixed once the catalog is loaded, so queries only add them up
+        average_length = sum(doc_lengths) / len(doc_lengths) if doc_lengths else 1.0
+        norms = k1 * (1 - b + b * np.asarray(doc_lengths, dtype=np.float32) / average_length)
+        count = len(self.labels)
+        self.postings = {}
+        for term, docs in frequencies_by_term.items():
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            doc_ids = np.fromiter(docs.keys(), dtype=np.int32, count=len(docs))
+            frequency = np.fromiter(docs.values(), dtype=np.float32, count=len(docs))
+            self.postings[term] = (doc_ids, idf * frequency * (k1 + 1) / (frequency + norms[doc_ids]))
+        self.sorted_surface_forms = sorted(self.surface_forms)
+
+    def expand_prefix(self, prefix):
+        terms = set()
+        start = bisect_left(self.sorted_surface_forms, prefix)
+        for surface in self.sorted_surface_forms[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not surface.startswith(prefix):
+                break
+            terms.update(self.surface_forms[surface])
+        return terms
+
+    def _score_term(self, term, scores):
+        posting = self.postings.get(term)
+        if posting is None:
+            return False
+        doc_ids, term_scores = posting
+        # Document ids are unique within a posting list, so fancy-index addition is safe
+        scores[doc_ids] += term_scores
+        return True
+
+    def search(self, query, limit=10, prefix=True):
+        tokens = tokenize(query)
+        if not tokens:
+            return [], []
+
+        scores = np.zeros(len(self.labels), dtype=np.float32)
+        matched = []
+        whole_tokens = tokens[:-1] if prefix else tokens
+        for term in dict.fromkeys(stem(token) for token in whole_tokens):
+            if self._score_term(term, scores):
+                matched.append(term)
+        for phrase in joined_phrases(tokens):
+            if self._score_term(phrase, scores):
+                matched.append(phrase)
+
+        if prefix:
+            # The last word may still be being typed; each document takes its best match among the completions
+            last = tokens[-1]
+            prefix_scores = np.zeros_like(scores)
+            for term in sorted(self.expand_prefix(last) | {stem(last)}):
+                term_scores = np.zeros_like(scores)
+                if self._score_term(term, term_scores):
+                    matched.append(term)
+                    np.maximum(prefix_scores, term_scores, out=prefix_scores)
+            scores += prefix_scores
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ranked = sorted(candidates.tolist(), key=lambda doc_id: (-scores[doc_id], self.labels[doc_id]))
+        return [{"label": self.labels[doc_id], "score": round(float(scores[doc_id]), 4)} for doc_id in ranked], matched
@@ -0,0 +1,27 @@
+from identify import CLASS_LABELS, IMAGE_SIZE
+
+
+def build_standin_model(architecture="xception"):
+    import tensorflow as tf
+
+    # Fixed weights so stand-ins built in different processes agree
+    tf.keras.utils.set_random_seed(0)
+    input_shape = IMAGE_SIZE + (3,)
+    if architecture == "xception":
+        return tf.keras.applications.Xception(weights=None, input_shape=input_shape, classes=len(CLASS_LABELS))
+
+    inputs = tf.keras.Input(shape=input_shape)
+    x = tf.keras.layers.Conv2D(16, 3, strides=2, activation="relu")(inputs)
+    x = tf.keras.layers.Conv2D(32, 3, strides=2, activation="relu")(x)
+    x = tf.keras.layers.GlobalAveragePooling2D()(x)
+    x = tf.keras.layers.Dense(64, activation="relu")(x)
+    outputs = tf.keras.layers.Dense(len(CLASS_LABELS), activation="softmax")(x)
+    return tf.keras.Model(inputs, outputs)
+
+
+def load_xception_standin():
+    return build_standin_model("xception")
+
+
+def load_small_standin():
+    return build_standin_model("small")
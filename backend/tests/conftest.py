@@ -0,0 +1,11 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Modules create their caches at import time; keep them out of the working tree
+os.environ.setdefault("TTS_CACHE_DIR", "")
+os.environ.setdefault("TRANSLATION_CACHE_PATH", "")
+os.environ.setdefault("TTS_SYNTHESIZER", "fake")
+os.environ.setdefault("TRANSLATOR_BACKEND", "fake")
@@ -0,0 +1,38 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from audio_jobs import AudioJobs
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    renders = []
+
+    def render(key, text, lang):
+        renders.append(key)
+        audio = f"[{lang}] {text}".encode("utf-8")
+        (tmp_path / f"{key}.mp3").write_bytes(audio)
+        return audio
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    jobs = AudioJobs(render, executor, str(tmp_path))
+    jobs.renders = renders
+    yield jobs
+    executor.shutdown(wait=True)
+
+
+def test_registered_audio_renders_again_after_eviction(jobs, tmp_path):
+    jobs.register("k1", "Holy basil.", "en")
+    assert jobs.ensure("k1", timeout=5) == b"[en] Holy basil."
+
+    os.remove(tmp_path / "k1.mp3")
+    assert jobs.ensure("k1", timeout=5) == b"[en] Holy basil."
+    assert jobs.renders == ["k1", "k1"]
+    assert (tmp_path / "k1.pending.json").exists()
+
+
+def test_unknown_key_is_not_rendered(jobs):
+    assert jobs.ensure("missing", timeout=5) is None
+    assert jobs.renders == []
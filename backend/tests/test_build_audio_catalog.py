@@ -0,0 +1,49 @@
+import json
+import os
+import sys
+
+import build_audio_catalog
+import tts
+from tts_synthesizers import FakeSynthesizer
+
+PLANTS = {
+    "Tulsi": {"family": "Lamiaceae", "description": "Holy basil. Grown in courtyards.", "medicinal_uses": ["Cough"]},
+    "Neem": {"family": "Meliaceae", "description": "Bitter leaves. Unreachable sentence.", "medicinal_uses": ["Skin"]},
+}
+
+
+class PartlyFailingSynthesizer(FakeSynthesizer):
+
+    def synthesize(self, text, lang):
+        if "Unreachable" in text:
+            raise RuntimeError("synthesis failed")
+        return super().synthesize(text, lang)
+
+
+def build(tmp_path, monkeypatch):
+    input_path = tmp_path / "plants.json"
+    input_path.write_text(json.dumps(PLANTS), encoding="utf-8")
+    output = tmp_path / "catalog"
+    monkeypatch.setattr(sys, "argv", ["build_audio_catalog.py", "--languages", "en",
+                                      "--input", str(input_path), "--output", str(output)])
+    build_audio_catalog.main()
+    with open(output / "manifest.json", "r", encoding="utf-8") as f:
+        return output, json.load(f)
+
+
+def test_records_with_skipped_chunks_are_not_written(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts, "TTS_CHUNK_CHARS", 20)
+    monkeypatch.setattr(tts, "TTS_CHUNK_RETRIES", 0)
+    previous = tts.synthesizer
+    tts.set_synthesizer(PartlyFailingSynthesizer())
+    try:
+        output, manifest = build(tmp_path, monkeypatch)
+        assert list(manifest["entries"]) == ["Tulsi"]
+        assert len([name for name in os.listdir(output) if name.endswith(".mp3")]) == 1
+
+        # Once synthesis works again the missing record is rendered on the next run
+        tts.set_synthesizer(FakeSynthesizer())
+        output, manifest = build(tmp_path, monkeypatch)
+        assert sorted(manifest["entries"]) == ["Neem", "Tulsi"]
+    finally:
+        tts.set_synthesizer(previous)
@@ -0,0 +1,30 @@
+import json
+
+from catalog import PlantCatalog
+
+PLANTS = {
+    "Aloevera": {
+        "scientific_name": "Aloe barbadensis miller",
+        "family": "Asphodelaceae",
+        "medicinal_uses": ["Burns", "Skin care"],
+        "properties": {"Antioxidant": "Yes"},
+    }
+}
+
+
+def make_catalog(tmp_path):
+    path = tmp_path / "plant_data.json"
+    path.write_text(json.dumps(PLANTS), encoding="utf-8")
+    return PlantCatalog(str(path), None, reload_interval=0)
+
+
+def test_get_returns_independent_copies(tmp_path):
+    catalog = make_catalog(tmp_path)
+    info = catalog.get("aloe vera")
+    info["medicinal_uses"].append("Changed")
+    info["properties"]["Antioxidant"] = "Changed"
+
+    fresh = catalog.get("Aloevera")
+    assert fresh == PLANTS["Aloevera"]
+    assert json.dumps(fresh)
+
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import download_model
+
+PAYLOAD = os.urandom(256 * 1024)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+
+    supports_ranges = True
+    # Ranged responses are cut off after this many bytes while fail_count is positive
+    fail_after = None
+    fail_count = 0
+    requests = []
+    bytes_sent = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        header = self.headers.get("Range")
+        with self.lock:
+            type(self).requests.append(header)
+        match = re.match(r"bytes=(\d+)-(\d*)", header or "")
+
+        if match and self.supports_ranges:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(PAYLOAD) - 1
+            body = PAYLOAD[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+        else:
+            body = PAYLOAD
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        with self.lock:
+            fail = match is not None and type(self).fail_count > 0 and len(body) > 1
+            if fail:
+                type(self).fail_count -= 1
+        if fail:
+            body = body[:self.fail_after]
+            self.close_connection = True
+        self.wfile.write(body)
+        with self.lock:
+            type(self).bytes_sent += len(body)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(download_model, "MIN_SEGMENT_SIZE", 16 * 1024)
+    monkeypatch.setattr(download_model, "CHUNK_SIZE", 4096)
+
+    handler = type("Handler", (StandInHandler,), {"requests": [], "bytes_sent": 0, "lock": threading.Lock()})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield handler, f"http://127.0.0.1:{httpd.server_address[1]}/model.h5"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_parallel_download(server, tmp_path):
+    handler, url = server
+    path = str(tmp_path / "model.h5")
+
+    download_model.download_model(url, path, sha256(PAYLOAD), connections=4)
+
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+    ranged = [r for r in handler.requests if r and r != "bytes=0-0"]
+    assert len(ranged) == 4
+    assert not os.path.exists(f"{path}.part")
+    assert not os.path.exists(f"{path}.part.json")
+
+
+def test_falls_back_when_server_ignores_ranges(server, tmp_path):
+    handler, url = server
+    handler.supports_ranges = False
+    path = str(tmp_path / "model.h5")
+
+    download_model.download_model(url, path, sha256(PAYLOAD), connections=4)
+
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+
+
+def test_checksum_mismatch_keeps_nothing(server, tmp_path):
+    _, url = server
+    path = str(tmp_path / "model.h5")
+
+    with pytest.raises(IOError, match="checksum mismatch"):
+        download_model.download_model(url, path, "0" * 64, connections=4)
+
+    assert not os.path.exists(path)
+    assert not os.path.exists(f"{path}.part")
+
+
+def test_parallel_resume_after_interruption(server, tmp_path):
+    handler, url = server
+    path = str(tmp_path / "model.h5")
+    handler.fail_after = 20 * 1024
+    handler.fail_count = 4
+
+    with pytest.raises(Exception):
+        download_model.download_model(url, path, sha256(PAYLOAD), connections=4)
+    assert os.path.exists(f"{path}.part.json")
+    assert not os.path.exists(path)
+
+    handler.bytes_sent = 0
+    download_model.download_model(url, path, sha256(PAYLOAD), connections=4)
+
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+    # Only the missing parts of each segment were fetched again
+    assert handler.bytes_sent < len(PAYLOAD)
+
+
+def test_sequential_rerun_after_interrupted_parallel_download(server, tmp_path):
+    handler, url = server
+    path = str(tmp_path / "model.h5")
+    handler.fail_after = 20 * 1024
+    handler.fail_count = 4
+
+    with pytest.raises(Exception):
+        download_model.download_model(url, path, sha256(PAYLOAD), connections=4)
+    assert os.path.getsize(f"{path}.part") == len(PAYLOAD)
+
+    # One connection takes the sequential path over the preallocated, mostly empty .part
+    download_model.download_model(url, path, sha256(PAYLOAD), connections=1)
+
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert not os.path.exists(f"{path}.part.json")
+
+
+def test_sequential_rerun_without_checksum_is_still_complete(server, tmp_path):
+    handler, url = server
+    path = str(tmp_path / "model.h5")
+    handler.fail_after = 20 * 1024
+    handler.fail_count = 4
+
+    with pytest.raises(Exception):
+        download_model.download_model(url, path, "", connections=4)
+    download_model.download_model(url, path, "", connections=1)
+
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+import embedding_index
+from embedding_index import EmbeddingIndex
+
+
+def entry(entry_id, key=None):
+    return {"id": entry_id, "filename": f"{entry_id}.jpg", "label": "Tulsi", "confidence": 0.9, "key": key}
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(1)
+    return rng.standard_normal((40, 512)).astype(np.float32)
+
+
+def test_query_after_growth(tmp_path, vectors, monkeypatch):
+    # A small starting size makes the file and the in-memory copy grow several times
+    monkeypatch.setattr(embedding_index, "INITIAL_CAPACITY", 4)
+    index = EmbeddingIndex(str(tmp_path), dim=64)
+    for i, vector in enumerate(vectors):
+        index.append(entry(f"e{i}"), vector)
+
+    matches = index.query(vectors[33], k=3)
+    assert matches[0]["id"] == "e33"
+    assert matches[0]["similarity"] == pytest.approx(1.0, abs=1e-3)
+
+    similar = index.query_by_id("e33", k=3)
+    assert "e33" not in [match["id"] for match in similar]
+    assert similar[:2] == matches[1:]
+
+
+def test_reload_and_duplicate(tmp_path, vectors):
+    index = EmbeddingIndex(str(tmp_path), dim=64)
+    index.append(entry("first", key="abc"), vectors[0])
+    index.append(entry("other"), vectors[1])
+    assert not index.append_duplicate(entry("missing", key="zzz"), "zzz")
+
+    reloaded = EmbeddingIndex(str(tmp_path), dim=64)
+    assert len(reloaded) == 2
+    assert reloaded.append_duplicate(entry("second", key="abc"), "abc")
+    assert reloaded.query_by_id("second", k=1)[0]["id"] == "first"
+    assert reloaded.query_by_id("second", k=1)[0]["similarity"] == pytest.approx(1.0, abs=1e-3)
@@ -0,0 +1,94 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from inference_pool import InferencePool, SLOT_SHAPE
+
+
+class StandInModel:
+
+    def __init__(self, delay=0.0, crash=False):
+        self.delay = delay
+        self.crash = crash
+
+    def predict_on_batch(self, batch):
+        if self.crash:
+            os._exit(3)
+        time.sleep(self.delay)
+        predictions = np.zeros((len(batch), 4), dtype=np.float32)
+        predictions[:, 2] = 0.9
+        return predictions
+
+
+def load_standin():
+    return StandInModel()
+
+
+def load_slow_standin():
+    return StandInModel(delay=3.0)
+
+
+def load_crashing_standin():
+    return StandInModel(crash=True)
+
+
+def load_broken_model():
+    raise RuntimeError("model file missing")
+
+
+def wait_for(condition, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(loader, **kwargs):
+        pool = InferencePool(1, loader, **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def test_submit_returns_prediction(make_pool):
+    pool = make_pool(load_standin)
+    index, confidence = pool.submit(np.zeros(SLOT_SHAPE, dtype=np.float32))
+    assert index == 2
+    assert confidence == pytest.approx(0.9)
+
+
+def test_submit_times_out(make_pool):
+    pool = make_pool(load_slow_standin, submit_timeout=0.5)
+    with pytest.raises(TimeoutError):
+        pool.submit(np.zeros(SLOT_SHAPE, dtype=np.float32))
+    assert pool.stats()["free_slots"] == pool.num_slots
+
+
+def test_crashed_worker_fails_pending_requests(make_pool):
+    pool = make_pool(load_crashing_standin, restart_backoff=0.1)
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        pool.submit(np.zeros(SLOT_SHAPE, dtype=np.float32))
+    assert time.monotonic() - started < 10
+
+
+def test_gives_up_after_max_restarts(make_pool):
+    pool = make_pool(load_broken_model, max_restarts=2, restart_backoff=0.1)
+    assert wait_for(lambda: pool.failed)
+    stats = pool.stats()
+    assert stats["restarts"] == 2
+    assert stats["failed"]
+    assert "exited with code" in stats["last_error"]
+    with pytest.raises(RuntimeError, match="unavailable"):
+        pool.submit(np.zeros(SLOT_SHAPE, dtype=np.float32))
@@ -0,0 +1,52 @@
+import io
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+from PIL import Image
+
+from identify import IMAGE_SIZE, preprocess_image_bytes
+from standin_model import load_xception_standin
+
+
+def make_photo_jpeg(seed, size=(1600, 1200)):
+    # A coloured gradient with sensor-like noise, large enough for draft mode to downscale
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, 3).astype(np.float32)
+    gradient = np.linspace(-60, 60, size[0], dtype=np.float32)[None, :, None] * rng.uniform(-1, 1, 3)
+    pixels = base + gradient + rng.normal(0, 20, (size[1], size[0], 3))
+    buffer = io.BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def keras_preprocess(path):
+    from tensorflow.keras.preprocessing import image
+    img = image.load_img(path, target_size=IMAGE_SIZE)
+    return image.img_to_array(img) / 255.0
+
+
+@pytest.fixture(scope="module")
+def model():
+    return load_xception_standin()
+
+
+def test_draft_decode_keeps_top1(model, tmp_path):
+    draft, reference = [], []
+    for seed in range(12):
+        data = make_photo_jpeg(seed)
+        path = tmp_path / f"photo{seed}.jpg"
+        path.write_bytes(data)
+        draft.append(preprocess_image_bytes(data))
+        reference.append(keras_preprocess(str(path)))
+    draft, reference = np.stack(draft), np.stack(reference)
+
+    # Draft decoding is close to, not identical with, keras load_img
+    assert np.abs(draft - reference).mean() < 0.06
+
+    draft_top1 = np.argmax(model.predict_on_batch(draft), axis=1)
+    reference_top1 = np.argmax(model.predict_on_batch(reference), axis=1)
+    assert len(set(reference_top1)) > 1
+    assert list(draft_top1) == list(reference_top1)
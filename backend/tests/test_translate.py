@@ -0,0 +1,70 @@
+import pytest
+
+import translate
+from translation_cache import TranslationCache
+from translator_backends import FakeTranslatorBackend
+
+RECORD = {
+    "scientific_name": "Ocimum tenuiflorum",
+    "family": "Lamiaceae",
+    "description": "Sacred basil grown in courtyards.",
+    "medicinal_uses": ["Cough", "Fever"],
+    "regions": ["India"],
+}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    # A fresh counting backend and an empty in-memory cache for every test
+    backend = FakeTranslatorBackend()
+    previous_backend, previous_dictionary = translate.translator_backend, translate.phrase_dictionary
+    translate.set_translator_backend(backend)
+    translate.set_phrase_dictionary({})
+    monkeypatch.setattr(translate, "translation_cache", TranslationCache("", 4096, 100000))
+    yield backend
+    translate.set_translator_backend(previous_backend)
+    translate.set_phrase_dictionary(previous_dictionary)
+
+
+def test_record_is_one_round_trip(backend):
+    info, untranslated = translate.translate_plant_info_with_status(RECORD, "hi")
+    assert untranslated == []
+    assert info["[hi] Family"] == "[hi] Lamiaceae"
+    assert backend.calls == 1
+
+
+def test_chunks_respect_item_limit(backend, monkeypatch):
+    monkeypatch.setattr(translate, "TRANSLATION_BATCH_MAX_ITEMS", 2)
+    translate.translate_batch([f"plant {i}" for i in range(5)], "hi")
+    assert backend.calls == 3
+    assert backend.strings == 5
+
+
+def test_chunks_respect_char_limit(backend, monkeypatch):
+    # Each string takes 11 characters with its separator, so two fit under 25
+    monkeypatch.setattr(translate, "TRANSLATION_BATCH_MAX_CHARS", 25)
+    translate.translate_batch([f"leaf {i:05d}" for i in range(5)], "hi")
+    assert backend.calls == 3
+
+
+def test_warm_cache_makes_no_calls(backend):
+    translate.translate_plant_info_with_status(RECORD, "hi")
+    backend.calls = backend.strings = 0
+    translate.translate_plant_info_with_status(RECORD, "hi")
+    assert backend.calls == 0
+
+
+def test_cleanup_passes_add_one_call_each(backend):
+    # The fake keeps the English words, so both cleanup passes find something to retranslate
+    record = {**RECORD, "properties": {"Antioxidant": "High", "Traditional use": "Tea"}}
+    translate.translate_plant_info_with_status(record, "hi")
+    assert backend.calls == 3
+
+
+def test_dictionary_phrases_skip_cleanup(backend):
+    translate.set_phrase_dictionary({"hi": {
+        "Properties": "गुण", "Antioxidant": "एंटीऑक्सीडेंट", "High": "उच्च", "Traditional use": "पारंपरिक उपयोग",
+    }})
+    record = {**RECORD, "properties": {"Antioxidant": "High", "Traditional use": "Tea"}}
+    translate.translate_plant_info_with_status(record, "hi")
+    assert backend.calls == 1
@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+
+import tts
+from tts_synthesizers import FakeSynthesizer
+
+SENTENCES = [f"Sentence number {i} about the leaf." for i in range(8)]
+TEXT = " ".join(SENTENCES)
+
+
+def id3_tag(payload=b"TAGDATA"):
+    size = len(payload)
+    header = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    return b"ID3\x04\x00\x00" + header + payload
+
+
+class StandInSynthesizer(FakeSynthesizer):
+
+    # Adds an ID3 tag like gTTS, tracks overlapping calls and fails chosen chunks
+    def __init__(self, latency=0.02, failures=None):
+        super().__init__(latency=latency)
+        self.failures = dict(failures or {})
+        self.active = 0
+        self.max_active = 0
+        self._active_lock = threading.Lock()
+
+    def synthesize(self, text, lang):
+        with self._active_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            # Earlier sentences take longer, so finishing order differs from text order
+            number = int(text.split()[2])
+            time.sleep(0.01 * (8 - number))
+            audio = super().synthesize(text, lang)
+        finally:
+            with self._active_lock:
+                self.active -= 1
+        with self._active_lock:
+            remaining = self.failures.get(number, 0)
+            if remaining:
+                self.failures[number] = remaining - 1
+                raise RuntimeError(f"synthesis failed for sentence {number}")
+        return id3_tag() + audio
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    monkeypatch.setattr(tts, "TTS_CHUNK_CHARS", 40)
+    monkeypatch.setattr(tts, "TTS_CONCURRENCY", 4)
+    previous = tts.synthesizer
+
+    def install(**kwargs):
+        synthesizer = StandInSynthesizer(**kwargs)
+        tts.set_synthesizer(synthesizer)
+        return synthesizer
+
+    yield install
+    tts.set_synthesizer(previous)
+
+
+def spoken(audio):
+    return [line for line in audio.split(b"\xff\xfb") if line.startswith(b"[en]")]
+
+
+def test_chunks_join_in_text_order(standin):
+    standin()
+    audio = b"".join(tts.iter_synthesized_chunks(TEXT, "en"))
+    assert spoken(audio) == [f"[en] {sentence}".encode() for sentence in SENTENCES]
+
+
+def test_only_first_chunk_keeps_id3_tag(standin):
+    standin()
+    audio = b"".join(tts.iter_synthesized_chunks(TEXT, "en"))
+    assert audio.startswith(id3_tag())
+    assert audio.count(b"ID3") == 1
+
+
+def test_concurrency_cap(standin, monkeypatch):
+    synthesizer = standin()
+    monkeypatch.setattr(tts, "TTS_CONCURRENCY", 2)
+    list(tts.iter_synthesized_chunks(TEXT, "en"))
+    assert synthesizer.calls == len(SENTENCES)
+    assert synthesizer.max_active == 2
+
+
+def test_failed_chunk_is_retried(standin):
+    standin(failures={3: 1})
+    retries = tts.tts_counters.get("chunk_retries")
+    skipped = []
+    audio = b"".join(tts.iter_synthesized_chunks(TEXT, "en", skipped))
+    assert skipped == []
+    assert len(spoken(audio)) == len(SENTENCES)
+    assert tts.tts_counters.get("chunk_retries") == retries + 1
+
+
+def test_chunk_that_keeps_failing_is_skipped(standin):
+    standin(failures={3: 99})
+    skipped = []
+    audio = b"".join(tts.iter_synthesized_chunks(TEXT, "en", skipped))
+    assert skipped == [3]
+    assert b"Sentence number 3" not in audio
+    assert len(spoken(audio)) == len(SENTENCES) - 1
+
+
+def test_first_chunk_skipped_keeps_one_id3_tag(standin):
+    standin(failures={0: 99})
+    audio = b"".join(tts.iter_synthesized_chunks(TEXT, "en", []))
+    assert audio.startswith(id3_tag())
+    assert audio.count(b"ID3") == 1
+
+
+def test_every_chunk_failing_raises(standin):
+    standin(failures={i: 99 for i in range(8)})
+    with pytest.raises(RuntimeError):
+        list(tts.iter_synthesized_chunks(TEXT, "en"))
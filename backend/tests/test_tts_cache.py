@@ -0,0 +1,29 @@
+import os
+import time
+
+from tts_cache import TTSCache
+
+
+def write(path, size, age):
+    path.write_bytes(b"x" * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+
+
+def test_ttl_expires_sidecars(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=0, ttl_seconds=60)
+    write(tmp_path / "old.pending.json", 10, age=120)
+    write(tmp_path / "new.pending.json", 10, age=5)
+    write(tmp_path / "notes.txt", 10, age=120)
+    cache.evict()
+    assert sorted(os.listdir(tmp_path)) == ["new.pending.json", "notes.txt"]
+
+
+def test_lru_evicts_sidecars_with_audio(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=150)
+    write(tmp_path / "a.mp3", 100, age=300)
+    write(tmp_path / "a.pending.json", 50, age=290)
+    write(tmp_path / "b.mp3", 100, age=10)
+    write(tmp_path / "b.pending.json", 50, age=5)
+    cache.evict()
+    assert sorted(os.listdir(tmp_path)) == ["b.mp3", "b.pending.json"]
@@ -0,0 +1,45 @@
+import threading
+
+import numpy as np
+
+
+class TFLiteModel:
+
+    def __init__(self, model_path, num_threads=None):
+        import tensorflow as tf
+
+        self.model_path = model_path
+        self._interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = None
+        self._lock = threading.Lock()
+
+    def _resize(self, batch_size):
+        if batch_size != self._batch_size:
+            shape = [batch_size] + list(self._input["shape"][1:])
+            self._interpreter.resize_tensor_input(self._input["index"], shape)
+            self._interpreter.allocate_tensors()
+            self._input = self._interpreter.get_input_details()[0]
+            self._output = self._interpreter.get_output_details()[0]
+            self._batch_size = batch_size
+
+    def predict_on_batch(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            self._resize(batch.shape[0])
+
+            dtype = self._input["dtype"]
+            if dtype != np.float32:
+                scale, zero_point = self._input["quantization"]
+                info = np.iinfo(dtype)
+                batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(dtype)
+
+            self._interpreter.set_tensor(self._input["index"], batch)
+            self._interpreter.invoke()
+            output = self._interpreter.get_tensor(self._output["index"])
+
+            if output.dtype != np.float32:
+                scale, zero_point = self._output["quantization"]
+                output = (output.astype(np.float32) - zero_point) * scale
+            return output
@@ -0,0 +1,75 @@
+import argparse
+import os
+
+from identify import CLASS_LABELS, IMAGE_SIZE
+
+
+def build_cascade_model(weights):
+    import tensorflow as tf
+
+    base = tf.keras.applications.MobileNetV3Small(
+        input_shape=IMAGE_SIZE + (3,),
+        include_top=False,
+        include_preprocessing=False,
+        weights=weights,
+        pooling="avg",
+    )
+    base.trainable = False
+
+    inputs = tf.keras.Input(shape=IMAGE_SIZE + (3,))
+    # predict_plant feeds pixels scaled to [0, 1]; MobileNetV3 expects [-1, 1]
+    x = tf.keras.layers.Rescaling(2.0, offset=-1.0)(inputs)
+    x = base(x, training=False)
+    x = tf.keras.layers.Dropout(0.2)(x)
+    outputs = tf.keras.layers.Dense(len(CLASS_LABELS), activation="softmax")(x)
+    return tf.keras.Model(inputs, outputs), base
+
+
+def load_dataset(data_dir, subset, batch_size):
+    import tensorflow as tf
+
+    dataset = tf.keras.utils.image_dataset_from_directory(
+        data_dir,
+        class_names=CLASS_LABELS,
+        label_mode="categorical",
+        image_size=IMAGE_SIZE,
+        interpolation="nearest",
+        batch_size=batch_size,
+        validation_split=0.2,
+        subset=subset,
+        seed=42,
+    )
+    return dataset.map(lambda x, y: (x / 255.0, y)).prefetch(tf.data.AUTOTUNE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the small first-stage model used by the confidence cascade")
+    parser.add_argument("data_dir", help="Training images, one sub-folder per class label")
+    parser.add_argument("--output", default=os.path.join("model", "cascade_mobilenetv3.h5"))
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--fine-tune-epochs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--weights", default="imagenet", help="Backbone weights ('imagenet' or 'none')")
+    args = parser.parse_args()
+
+    import tensorflow as tf
+
+    train = load_dataset(args.data_dir, "training", args.batch_size)
+    validation = load_dataset(args.data_dir, "validation", args.batch_size)
+
+    model, base = build_cascade_model(None if args.weights == "none" else args.weights)
+    model.compile(optimizer=tf.keras.optimizers.Adam(1e-3), loss="categorical_crossentropy", metrics=["accuracy"])
+    model.fit(train, validation_data=validation, epochs=args.epochs)
+
+    if args.fine_tune_epochs:
+        base.trainable = True
+        model.compile(optimizer=tf.keras.optimizers.Adam(1e-5), loss="categorical_crossentropy", metrics=["accuracy"])
+        model.fit(train, validation_data=validation, epochs=args.fine_tune_epochs)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    model.save(args.output)
+    print(f"Cascade model saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
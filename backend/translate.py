@@ -1,180 +1,334 @@
-from googletrans import Translator
+import json
+import os
+import random
 import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from metrics import Counters, LatencyStats
+from translation_cache import TranslationCache
+from translator_backends import create_backend
 
-translator = Translator()
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", os.path.join("data", "translation_cache.sqlite3"))
+TRANSLATION_CACHE_MEMORY_SIZE = int(os.getenv("TRANSLATION_CACHE_MEMORY_SIZE", "4096"))
+TRANSLATION_CACHE_MAX_ROWS = int(os.getenv("TRANSLATION_CACHE_MAX_ROWS", "100000"))
+TRANSLATOR_BACKEND = os.getenv("TRANSLATOR_BACKEND", "google")
+TRANSLATION_BATCH_MAX_CHARS = int(os.getenv("TRANSLATION_BATCH_MAX_CHARS", "4500"))
+TRANSLATION_BATCH_MAX_ITEMS = int(os.getenv("TRANSLATION_BATCH_MAX_ITEMS", "100"))
+TRANSLATION_WORKERS = int(os.getenv("TRANSLATION_WORKERS", "16"))
+TRANSLATION_CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", "4"))
+TRANSLATION_RETRIES = int(os.getenv("TRANSLATION_RETRIES", "2"))
+TRANSLATION_RETRY_BASE_MS = float(os.getenv("TRANSLATION_RETRY_BASE_MS", "200"))
+TRANSLATION_DEADLINE_MS = float(os.getenv("TRANSLATION_DEADLINE_MS", "8000"))
+PHRASE_DICTIONARY_PATH = os.getenv("PHRASE_DICTIONARY_PATH", os.path.join("data", "phrase_dictionary.json"))
 
-def translate_text(text, target_lang):
-    
+ENGLISH_PATTERNS = [
+    r'\bInal\b', r'\binal\b', r'\bvalue\b', r'\buse\b', r'\buses\b',
+    r'\bmedium\b', r'\blow\b', r'\bhigh\b', r'\banti\b', r'\binflammatory\b',
+    r'\bantioxidant\b', r'\btraditional\b', r'\bmedicinal\b', r'\bmediclidalled\b',
+    r'\bMediclidalled\b', r'\bUses\b'
+]
+
+KEY_LABELS = {
+    "scientific_name": "Scientific Name",
+    "scientificName": "Scientific Name",
+    "scientific_label": "Scientific Name",
+    "family": "Family",
+    "description": "Description",
+    "medicinal_uses": "Medicinal Uses",
+    "medicinalUses": "Medicinal Uses",
+    "mediclidalled_uses": "Medicinal Uses",
+    "Mediclidalled Uses": "Medicinal Uses",
+    "regions": "Regions",
+    "properties": "Properties",
+    "Anti-inflammatory": "Anti-inflammatory",
+    "Antioxidant": "Antioxidant",
+    "Medicinal value": "Medicinal value",
+    "Traditional use": "Traditional use",
+    "Plant pada value": "Plant pada value",
+    "குடுமிப்பட்டு பயன்படுத்தல்": "Traditional use",
+}
+
+translator_backend = create_backend(TRANSLATOR_BACKEND)
+translation_cache = TranslationCache(TRANSLATION_CACHE_PATH, TRANSLATION_CACHE_MEMORY_SIZE, TRANSLATION_CACHE_MAX_ROWS)
+translation_counters = Counters(
+    "remote_calls", "remote_strings", "remote_errors", "retries", "deadline_misses", "source_strings", "dictionary_strings"
+)
+dictionary_fraction = LatencyStats()
+translation_executor = ThreadPoolExecutor(max_workers=max(1, TRANSLATION_WORKERS), thread_name_prefix="translate")
+
+def load_phrase_dictionary(path=PHRASE_DICTIONARY_PATH):
+    if not path or not os.path.exists(path):
+        return {}
     try:
-        if not text or not isinstance(text, str) or not text.strip() or target_lang == 'en':
-            return text
-        
-        processed_text = text
-        
-        translated = translator.translate(processed_text, dest=target_lang)
-        result = translated.text
-        
-        return result
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
     except Exception as e:
-        print(f"[Translation Error] Text: {text}, Error: {e}")
+        print(f"[Phrase Dictionary Error] {e}")
+        return {}
+
+phrase_dictionary = load_phrase_dictionary()
+
+def set_phrase_dictionary(dictionary):
+    global phrase_dictionary
+    phrase_dictionary = dictionary
+
+def set_translator_backend(backend):
+    global translator_backend
+    translator_backend = backend
+
+def get_translation_stats():
+    counters = translation_counters.snapshot()
+    return {
+        **counters,
+        "dictionary_hit_rate": round(counters["dictionary_strings"] / counters["source_strings"], 4)
+        if counters["source_strings"] else 0.0,
+        "dictionary_fraction_per_record": dictionary_fraction.summary(),
+        "dictionary_languages": len(phrase_dictionary),
+        "cache": translation_cache.stats(),
+    }
+
+def chunk_texts(texts):
+    chunk, size = [], 0
+    for text in texts:
+        if translator_backend.separator in text:
+            # Multi-line strings cannot share a joined request
+            yield [text]
+            continue
+        if chunk and (len(chunk) >= TRANSLATION_BATCH_MAX_ITEMS or size + len(text) + 1 > TRANSLATION_BATCH_MAX_CHARS):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(text)
+        size += len(text) + 1
+    if chunk:
+        yield chunk
+
+def translate_chunk(chunk, target_lang, deadline=None):
+    for attempt in range(TRANSLATION_RETRIES + 1):
+        translation_counters.incr("remote_calls")
+        translation_counters.incr("remote_strings", len(chunk))
+        try:
+            results = translator_backend.translate_batch(chunk, target_lang)
+            break
+        except Exception:
+            translation_counters.incr("remote_errors")
+            # Full jitter keeps concurrent retries from hitting the service in lockstep
+            delay = TRANSLATION_RETRY_BASE_MS / 1000 * 2 ** attempt * random.uniform(0.5, 1.5)
+            if attempt == TRANSLATION_RETRIES or (deadline is not None and time.perf_counter() + delay >= deadline):
+                raise
+            translation_counters.incr("retries")
+            time.sleep(delay)
+
+    for text, result in zip(chunk, results):
+        translation_cache.put(text, target_lang, result)
+    return dict(zip(chunk, results))
+
+def translate_batch(texts, target_lang, deadline=None):
+
+    translations = {}
+    if target_lang == 'en':
+        return translations
+
+    missing = []
+    for text in dict.fromkeys(texts):
+        if not text or not isinstance(text, str) or not text.strip():
+            continue
+        cached = translation_cache.get(text, target_lang)
+        if cached is not None:
+            translations[text] = cached
+        else:
+            missing.append(text)
+
+    queued = list(chunk_texts(missing))
+    in_flight = {}
+    while queued or in_flight:
+        if deadline is not None and time.perf_counter() >= deadline:
+            # Chunks still running finish in the background and land in the cache for the next request
+            translation_counters.incr("deadline_misses")
+            break
+        while queued and len(in_flight) < max(1, TRANSLATION_CONCURRENCY):
+            chunk = queued.pop(0)
+            in_flight[translation_executor.submit(translate_chunk, chunk, target_lang, deadline)] = chunk
+
+        timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+        done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            chunk = in_flight.pop(future)
+            try:
+                translations.update(future.result())
+            except Exception as e:
+                print(f"[Translation Error] Batch of {len(chunk)} strings, Error: {e}")
+
+    return translations
+
+def translate_text(text, target_lang):
+
+    if not text or not isinstance(text, str) or not text.strip() or target_lang == 'en':
         return text
 
+    return translate_batch([text], target_lang).get(text, text)
+
+
+def needs_cleaning(text):
+    return any(re.search(pattern, text, re.IGNORECASE) for pattern in ENGLISH_PATTERNS)
 
 def clean_translated_text(text, target_lang):
-    
+
     if not text or not isinstance(text, str) or target_lang == 'en':
         return text
-        
-    english_patterns = [
-        r'\bInal\b', r'\binal\b', r'\bvalue\b', r'\buse\b', r'\buses\b', 
-        r'\bmedium\b', r'\blow\b', r'\bhigh\b', r'\banti\b', r'\binflammatory\b',
-        r'\bantioxidant\b', r'\btraditional\b', r'\bmedicinal\b', r'\bmediclidalled\b',
-        r'\bMediclidalled\b', r'\bUses\b'
-    ]
-    
-    needs_cleaning = False
-    for pattern in english_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            needs_cleaning = True
-            break
-            
-    if needs_cleaning:
-        try:
-            translated = translator.translate(text, dest=target_lang)
-            return translated.text
-        except Exception as e:
-            print(f"[Cleaning Error] Text: {text}, Error: {e}")
-    
+
+    if needs_cleaning(text):
+        return translate_batch([text], target_lang).get(text, text)
+
     return text
 
+def clean_translated_batch(texts, target_lang, deadline=None, protected=()):
+    candidates = [
+        text for text in texts
+        if text and isinstance(text, str) and text not in protected and needs_cleaning(text)
+    ]
+    return translate_batch(candidates, target_lang, deadline)
 
-def translate_plant_info(info, target_lang):
-    
-    if not info or not isinstance(info, dict) or target_lang == 'en':
-        return info
 
-    translated_info = {}
+def replace_inal(text):
+    return text.replace('Inal', 'Plant').replace('inal', 'plant')
 
+def preprocess_plant_info(info):
     processed_info = {}
     for key, value in info.items():
-        new_key = key.replace('Inal', 'Plant').replace('inal', 'plant')
-        
+        new_key = replace_inal(key)
+
         if isinstance(value, str):
-            processed_info[new_key] = value.replace('Inal', 'Plant').replace('inal', 'plant')
+            processed_info[new_key] = replace_inal(value)
+        elif isinstance(value, dict):
+            processed_info[new_key] = {
+                replace_inal(prop_key): replace_inal(prop_value) if isinstance(prop_value, str) else prop_value
+                for prop_key, prop_value in value.items()
+            }
+        elif isinstance(value, list):
+            processed_info[new_key] = [replace_inal(item) if isinstance(item, str) else item for item in value]
+        else:
+            processed_info[new_key] = value
+    return processed_info
+
+def collect_source_strings(processed_info, phrases=None):
+    phrases = phrases or {}
+    strings = []
+    for key, value in processed_info.items():
+        strings.append(KEY_LABELS.get(key, key))
+        if isinstance(value, str):
+            strings.append(value)
+        elif isinstance(value, list):
+            strings.extend(item for item in value if isinstance(item, str))
         elif isinstance(value, dict):
-            new_dict = {}
             for prop_key, prop_value in value.items():
-                new_prop_key = prop_key.replace('Inal', 'Plant').replace('inal', 'plant')
+                # Multi-word property names are translated word by word unless the dictionary knows them
+                strings.extend([prop_key] if prop_key in phrases else prop_key.split(' '))
                 if isinstance(prop_value, str):
-                    new_dict[new_prop_key] = prop_value.replace('Inal', 'Plant').replace('inal', 'plant')
-                else:
-                    new_dict[new_prop_key] = prop_value
-            processed_info[new_key] = new_dict
+                    strings.append(prop_value)
+    return strings
+
+def find_untranslated_fields(info, processed_info, translations, phrases=None):
+    untranslated = []
+    # Report the caller's original keys, not the preprocessed ones
+    for key, (processed_key, value) in zip(info, processed_info.items()):
+        strings = collect_source_strings({processed_key: value}, phrases)
+        if any(text and text.strip() and text not in translations for text in strings):
+            untranslated.append(key)
+    return untranslated
+
+def assemble_translated_info(processed_info, translations):
+    lookup = lambda text: translations.get(text, text)
+
+    translated_info = {}
+    for key, value in processed_info.items():
+        translated_key = lookup(KEY_LABELS.get(key, key))
+        if isinstance(value, str):
+            translated_info[translated_key] = lookup(value)
         elif isinstance(value, list):
-            new_list = []
-            for item in value:
-                if isinstance(item, str):
-                    new_list.append(item.replace('Inal', 'Plant').replace('inal', 'plant'))
-                else:
-                    new_list.append(item)
-            processed_info[new_key] = new_list
+            translated_info[translated_key] = [lookup(item) if isinstance(item, str) else item for item in value]
+        elif isinstance(value, dict):
+            translated_info[translated_key] = {
+                lookup(prop_key) if prop_key in translations else ' '.join(lookup(part) for part in prop_key.split(' ')):
+                    lookup(prop_value) if isinstance(prop_value, str) else prop_value
+                for prop_key, prop_value in value.items()
+            }
         else:
-            processed_info[new_key] = value
+            translated_info[translated_key] = value
+    return translated_info
+
+def collect_strings(info):
+    strings = []
+    for key, value in info.items():
+        strings.append(key)
+        if isinstance(value, str):
+            strings.append(value)
+        elif isinstance(value, list):
+            strings.extend(item for item in value if isinstance(item, str))
+        elif isinstance(value, dict):
+            for prop_key, prop_value in value.items():
+                strings.append(prop_key)
+                if isinstance(prop_value, str):
+                    strings.append(prop_value)
+    return strings
+
+def map_strings(info, mapping):
+    lookup = lambda text: mapping.get(text, text) if isinstance(text, str) else text
+
+    mapped = {}
+    for key, value in info.items():
+        if isinstance(value, dict):
+            mapped[lookup(key)] = {lookup(prop_key): lookup(prop_value) for prop_key, prop_value in value.items()}
+        elif isinstance(value, list):
+            mapped[lookup(key)] = [lookup(item) for item in value]
+        else:
+            mapped[lookup(key)] = lookup(value)
+    return mapped
+
+
+def record_dictionary_usage(source_strings, dictionary_translations):
+    served = sum(1 for text in source_strings if text in dictionary_translations)
+    translation_counters.incr("source_strings", len(source_strings))
+    translation_counters.incr("dictionary_strings", served)
+    if source_strings:
+        dictionary_fraction.record(served / len(source_strings))
+
+def translate_plant_info_with_status(info, target_lang, deadline_ms=TRANSLATION_DEADLINE_MS):
+
+    if not info or not isinstance(info, dict) or target_lang == 'en':
+        return info, []
+
+    deadline = time.perf_counter() + deadline_ms / 1000 if deadline_ms else None
+    processed_info = preprocess_plant_info(info)
+    phrases = phrase_dictionary.get(target_lang, {})
 
     try:
-        key_labels = {
-            "scientific_name": "Scientific Name", 
-            "scientificName": "Scientific Name",
-            "scientific_label": "Scientific Name",
-            "family": "Family",
-            "description": "Description",
-            "medicinal_uses": "Medicinal Uses",
-            "medicinalUses": "Medicinal Uses",
-            "mediclidalled_uses": "Medicinal Uses",
-            "Mediclidalled Uses": "Medicinal Uses",
-            "regions": "Regions",
-            "properties": "Properties",
-            "Anti-inflammatory": "Anti-inflammatory",
-            "Antioxidant": "Antioxidant",
-            "Medicinal value": "Medicinal value",
-            "Traditional use": "Traditional use",
-            "Plant pada value": "Plant pada value",
-            "குடுமிப்பட்டு பயன்படுத்தல்": "Traditional use",
-            "Mediclidalled Uses": "Medicinal Uses"
-        }
-
-        for key, value in processed_info.items():
-            display_key = key_labels.get(key, key)
-            translated_key = translate_text(display_key, target_lang)
-            translated_key = clean_translated_text(translated_key, target_lang)
-            
-            if isinstance(value, str):
-                translated_value = translate_text(value, target_lang)
-                translated_info[translated_key] = clean_translated_text(translated_value, target_lang)
-            elif isinstance(value, list):
-                translated_list = []
-                for item in value:
-                    if isinstance(item, str):
-                        translated_item = translate_text(item, target_lang)
-                        translated_list.append(clean_translated_text(translated_item, target_lang))
-                    else:
-                        translated_list.append(item)
-                translated_info[translated_key] = translated_list
-            elif isinstance(value, dict):
-                translated_dict = {}
-                for prop_key, prop_value in value.items():
-                    if ' ' in prop_key:
-                        parts = prop_key.split(' ')
-                        translated_parts = [translate_text(part, target_lang) for part in parts]
-                        translated_prop_key = ' '.join(translated_parts)
-                    else:
-                        translated_prop_key = translate_text(prop_key, target_lang)
-                    
-                    translated_prop_key = clean_translated_text(translated_prop_key, target_lang)
-                    
-                    if isinstance(prop_value, str):
-                        translated_prop_value = translate_text(prop_value, target_lang)
-                        translated_dict[translated_prop_key] = clean_translated_text(translated_prop_value, target_lang)
-                    else:
-                        translated_dict[translated_prop_key] = prop_value
-                
-                translated_info[translated_key] = translated_dict
-            else:
-                translated_info[translated_key] = value
+        source_strings = [text for text in collect_source_strings(processed_info, phrases) if text and text.strip()]
+        # Closed-vocabulary strings resolve by lookup and skip both the translator and the cleanup passes
+        translations = {text: phrases[text] for text in source_strings if text in phrases}
+        protected = set(translations.values())
+        record_dictionary_usage(source_strings, translations)
 
+        translations.update(translate_batch(
+            [text for text in source_strings if text not in translations], target_lang, deadline
+        ))
+        # Anything the translator did not return in time stays in English
+        untranslated = find_untranslated_fields(info, processed_info, translations, phrases)
+        translated_info = assemble_translated_info(processed_info, translations)
+        translated_info = map_strings(
+            translated_info, clean_translated_batch(collect_strings(translated_info), target_lang, deadline, protected)
+        )
     except Exception as e:
         print(f"[Translation Error] Failed to translate plant info: {e}")
-        return info
+        return info, list(info.keys())
 
     try:
-        final_info = {}
-        for key, value in translated_info.items():
-            final_key = clean_translated_text(key, target_lang)
-            
-            if isinstance(value, dict):
-                final_dict = {}
-                for prop_key, prop_value in value.items():
-                    final_prop_key = clean_translated_text(prop_key, target_lang)
-                    
-                    if isinstance(prop_value, str):
-                        final_dict[final_prop_key] = clean_translated_text(prop_value, target_lang)
-                    else:
-                        final_dict[final_prop_key] = prop_value
-                final_info[final_key] = final_dict
-            elif isinstance(value, list):
-                final_list = []
-                for item in value:
-                    if isinstance(item, str):
-                        final_list.append(clean_translated_text(item, target_lang))
-                    else:
-                        final_list.append(item)
-                final_info[final_key] = final_list
-            elif isinstance(value, str):
-                final_info[final_key] = clean_translated_text(value, target_lang)
-            else:
-                final_info[final_key] = value
-        
-        return final_info
+        # Second cleanup pass over everything, as a retranslation can itself leave English behind
+        return map_strings(
+            translated_info, clean_translated_batch(collect_strings(translated_info), target_lang, deadline, protected)
+        ), untranslated
     except Exception as e:
         print(f"[Final Cleanup Error]: {e}")
-        return translated_info
+        return translated_info, untranslated
+
+def translate_plant_info(info, target_lang):
+    return translate_plant_info_with_status(info, target_lang)[0]
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import Counters
+
+EVICTION_CHECK_INTERVAL = 256
+
+
+def make_translation_key(text, target_lang):
+    return hashlib.sha256(f"{target_lang}\0{text}".encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+
+    def __init__(self, db_path, max_memory_entries=4096, max_rows=100000):
+        self.db_path = db_path or None
+        self.max_memory_entries = max(0, int(max_memory_entries))
+        self.max_rows = max(0, int(max_rows))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._puts_since_eviction = 0
+        self.counters = Counters("memory_hits", "disk_hits", "misses", "stores", "evictions")
+        if self.db_path:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._connection().execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, lang TEXT NOT NULL, translated TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._connection().execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations(last_used)")
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            # WAL lets several gunicorn workers read while one writes
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _remember(self, key, value):
+        if not self.max_memory_entries:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_memory_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, text, target_lang):
+        key = make_translation_key(text, target_lang)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        if value is not None:
+            self.counters.incr("memory_hits")
+            return value
+
+        if self.db_path:
+            try:
+                connection = self._connection()
+                row = connection.execute("SELECT translated FROM translations WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    connection.execute("UPDATE translations SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self._remember(key, row[0])
+                    self.counters.incr("disk_hits")
+                    return row[0]
+            except sqlite3.Error as e:
+                print(f"[Translation Cache Error] {e}")
+
+        self.counters.incr("misses")
+        return None
+
+    def put(self, text, target_lang, translated):
+        key = make_translation_key(text, target_lang)
+        self._remember(key, translated)
+        self.counters.incr("stores")
+        if not self.db_path:
+            return
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO translations (key, lang, translated, last_used) VALUES (?, ?, ?, ?)",
+                (key, target_lang, translated, time.time()),
+            )
+            with self._lock:
+                self._puts_since_eviction += 1
+                check = self._puts_since_eviction >= EVICTION_CHECK_INTERVAL
+                if check:
+                    self._puts_since_eviction = 0
+            if check:
+                self.evict()
+        except sqlite3.Error as e:
+            print(f"[Translation Cache Error] {e}")
+
+    def evict(self):
+        if not self.db_path or not self.max_rows:
+            return 0
+        connection = self._connection()
+        count = connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        excess = count - self.max_rows
+        if excess <= 0:
+            return 0
+        connection.execute(
+            "DELETE FROM translations WHERE key IN (SELECT key FROM translations ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        self.counters.incr("evictions", excess)
+        return excess
+
+    def stats(self):
+        counters = self.counters.snapshot()
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        with self._lock:
+            memory_entries = len(self._entries)
+        return {
+            **counters,
+            "memory_entries": memory_entries,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "db_path": self.db_path,
+        }
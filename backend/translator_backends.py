@@ -0,0 +1,64 @@
+import threading
+import time
+
+
+class GoogleTranslatorBackend:
+
+    separator = "\n"
+
+    def __init__(self):
+        from googletrans import Translator
+        self._translator_class = Translator
+        self._local = threading.local()
+
+    @property
+    def translator(self):
+        # Batches are sent from several threads; each keeps its own HTTP session
+        translator = getattr(self._local, "translator", None)
+        if translator is None:
+            translator = self._local.translator = self._translator_class()
+        return translator
+
+    def translate_batch(self, texts, target_lang):
+        if len(texts) == 1:
+            return [self.translator.translate(texts[0], dest=target_lang).text]
+
+        # One request for the whole chunk; the service keeps line breaks between segments
+        result = self.translator.translate(self.separator.join(texts), dest=target_lang).text
+        parts = result.split(self.separator)
+        if len(parts) == len(texts):
+            return [part.strip() for part in parts]
+
+        print(f"[Translation Warning] Batch of {len(texts)} came back as {len(parts)} lines; translating one by one")
+        return [self.translator.translate(text, dest=target_lang).text for text in texts]
+
+
+class FakeTranslatorBackend:
+
+    separator = "\n"
+
+    def __init__(self, latency=0.0, fail_times=0):
+        self.latency = latency
+        self.fail_times = fail_times
+        self.calls = 0
+        self.strings = 0
+        self._lock = threading.Lock()
+
+    def translate_batch(self, texts, target_lang):
+        with self._lock:
+            self.calls += 1
+            self.strings += len(texts)
+            fail = self.fail_times > 0
+            if fail:
+                self.fail_times -= 1
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ConnectionError("Fake translator failure")
+        return [f"[{target_lang}] {text}" for text in texts]
+
+
+def create_backend(name):
+    if name == "fake":
+        return FakeTranslatorBackend()
+    return GoogleTranslatorBackend()
@@ -1,7 +1,25 @@
-from gtts import gTTS
+from audio_jobs import AudioJobs
+from tts_cache import TTSCache, make_tts_key
+from tts_synthesizers import create_synthesizer
+from metrics import Counters
+from concurrent.futures import ThreadPoolExecutor
 import base64
-import tempfile
 import os
+import re
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join("static", "tts_cache"))
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "512"))
+TTS_CACHE_TTL_HOURS = float(os.getenv("TTS_CACHE_TTL_HOURS", "0"))
+TTS_AUDIO_MODE = os.getenv("TTS_AUDIO_MODE", "url")
+AUDIO_CATALOG_DIR = os.getenv("AUDIO_CATALOG_DIR", os.path.join("static", "audio_catalog"))
+TTS_SYNTHESIZER = os.getenv("TTS_SYNTHESIZER", "gtts")
+TTS_CHUNK_CHARS = int(os.getenv("TTS_CHUNK_CHARS", "200"))
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "16"))
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+TTS_CHUNK_RETRIES = int(os.getenv("TTS_CHUNK_RETRIES", "2"))
+TTS_DEFER_MODE = os.getenv("TTS_DEFER_MODE", "off")
+TTS_JOB_WORKERS = int(os.getenv("TTS_JOB_WORKERS", "4"))
+TTS_LAZY_TIMEOUT_S = float(os.getenv("TTS_LAZY_TIMEOUT_S", "60"))
 
 SUPPORTED_LANGUAGES = {
     'af', 'sq', 'ar', 'hy', 'bn', 'bs', 'ca', 'hr', 'cs', 'da', 'nl', 'en', 'eo',
@@ -11,6 +29,75 @@ SUPPORTED_LANGUAGES = {
     'ta', 'te', 'th', 'tr', 'uk', 'ur', 'vi', 'cy', 'zh-CN', 'zh-TW', 'zu'
 }
 
+tts_cache = TTSCache(TTS_CACHE_DIR, TTS_CACHE_MAX_MB * 1024 * 1024, TTS_CACHE_TTL_HOURS * 3600)
+synthesizer = create_synthesizer(TTS_SYNTHESIZER)
+tts_counters = Counters("catalog_hits", "chunk_retries", "skipped_chunks")
+tts_executor = ThreadPoolExecutor(max_workers=max(1, TTS_WORKERS), thread_name_prefix="tts")
+
+def render_tts_audio(key, text, lang):
+    skipped = []
+    audio = b''.join(iter_synthesized_chunks(text, lang, skipped))
+    if not skipped:
+        # Audio with a missing sentence is served once but synthesized again next time
+        tts_cache.put(key, audio)
+    return audio
+
+audio_jobs = AudioJobs(
+    render_tts_audio,
+    ThreadPoolExecutor(max_workers=max(1, TTS_JOB_WORKERS), thread_name_prefix="tts-job"),
+    tts_cache.directory
+)
+
+def set_synthesizer(new_synthesizer):
+    global synthesizer
+    synthesizer = new_synthesizer
+
+def audio_urls_enabled():
+    # URLs point into the cache directory, so they need it enabled
+    return bool(tts_cache.directory)
+
+def get_catalog_audio_path(key):
+    if not AUDIO_CATALOG_DIR:
+        return None
+    path = os.path.join(AUDIO_CATALOG_DIR, f"{key}.mp3")
+    return path if os.path.exists(path) else None
+
+def get_tts_audio_path(key):
+    # Pre-rendered catalog audio is never evicted, so it is checked first
+    path = get_catalog_audio_path(key)
+    if path or not audio_urls_enabled():
+        return path
+    path = tts_cache.path_for(key)
+    return path if os.path.exists(path) else None
+
+def remember_tts_recipe(key, text, lang):
+    # Lets GET /audio/<key>.mp3 render the audio again after the cache evicts it
+    if audio_urls_enabled() and not get_catalog_audio_path(key):
+        audio_jobs.register(key, text, lang)
+
+def ensure_tts_audio(key, timeout=TTS_LAZY_TIMEOUT_S):
+    path = get_tts_audio_path(key)
+    if path:
+        return path
+    try:
+        # Waits for an in-flight job, or starts one for audio that was only registered
+        if audio_jobs.ensure(key, timeout) is None:
+            return None
+    except Exception as e:
+        print(f"[TTS Error] Deferred audio {key} failed: {e}")
+        return None
+    return get_tts_audio_path(key)
+
+def get_tts_stats():
+    return {
+        "cache": tts_cache.stats(),
+        "jobs": audio_jobs.stats(),
+        "defer_mode": TTS_DEFER_MODE,
+        "catalog_hits": tts_counters.get("catalog_hits"),
+        "chunk_retries": tts_counters.get("chunk_retries"),
+        "skipped_chunks": tts_counters.get("skipped_chunks"),
+    }
+
 def build_tts_content(info):
     
     if not info or not isinstance(info, dict):
@@ -36,40 +123,180 @@ def build_tts_content(info):
     return ' '.join(parts)
 
 
-def generate_tts(text_or_info, lang='en', is_full_info=False):
+def split_tts_text(text, max_chars=None):
+    max_chars = max_chars or TTS_CHUNK_CHARS
+    # build_tts_content ends every field with a full stop, so sentences are also field boundaries
+    sentences = [part for part in re.split(r'(?<=[.!?।。])\s+', text.strip()) if part]
+    chunks, current = [], ''
+    for sentence in sentences:
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def strip_id3(audio):
+    # Only the first chunk keeps its ID3 tag; later tags would sit between MPEG frames
+    if len(audio) < 10 or not audio.startswith(b"ID3"):
+        return audio
+    size = (audio[6] << 21) | (audio[7] << 14) | (audio[8] << 7) | audio[9]
+    return audio[10 + size:]
+
+
+def synthesize_with_retries(chunk, lang, future=None):
+    # The first attempt may already be running on tts_executor; retries run in the calling thread
+    for attempt in range(max(0, TTS_CHUNK_RETRIES) + 1):
+        try:
+            if attempt == 0 and future is not None:
+                return future.result()
+            if attempt:
+                tts_counters.incr("chunk_retries")
+            return synthesizer.synthesize(chunk, lang)
+        except Exception as e:
+            error = e
+    raise error
+
+
+def iter_synthesized_chunks(text, lang, skipped=None):
+    chunks = split_tts_text(text)
+    if len(chunks) <= 1:
+        yield synthesize_with_retries(text, lang)
+        return
+
+    futures = []
+    next_chunk = 0
+    yielded = False
+    for index in range(len(chunks)):
+        # Keep at most TTS_CONCURRENCY chunks of this request in flight, yielding them in order
+        while next_chunk < len(chunks) and next_chunk < index + max(1, TTS_CONCURRENCY):
+            futures.append(tts_executor.submit(synthesizer.synthesize, chunks[next_chunk], lang))
+            next_chunk += 1
+        try:
+            audio = synthesize_with_retries(chunks[index], lang, futures[index])
+        except Exception as e:
+            # One failed sentence should not cost the listener the rest of the audio
+            tts_counters.incr("skipped_chunks")
+            print(f"[TTS Warning] Skipping chunk {index + 1}/{len(chunks)} for '{lang}': {e}")
+            if skipped is not None:
+                skipped.append(index)
+            continue
+        yield strip_id3(audio) if yielded else audio
+        yielded = True
+
+    if not yielded:
+        raise RuntimeError(f"All {len(chunks)} TTS chunks failed")
+
+
+def resolve_tts_text(text_or_info, lang='en', is_full_info=False):
+    lang = lang.lower().strip()
+    if lang not in SUPPORTED_LANGUAGES:
+        print(f"[TTS Warning] Unsupported language code: {lang}. Defaulting to 'en'.")
+        lang = 'en'
+
+    if is_full_info and isinstance(text_or_info, dict):
+        text = build_tts_content(text_or_info)
+    else:
+        text = str(text_or_info)
+
+    if not text.strip():
+        print("[TTS Info] Empty text received. Skipping generation.")
+        return None, lang
+
+    if len(text) > 5000:
+        print("[TTS Info] Truncating text to 5000 characters.")
+        text = text[:5000]
+
+    return text, lang
+
+
+def read_catalog_audio(key):
+    path = get_catalog_audio_path(key)
+    if not path:
+        return None
+    with open(path, 'rb') as f:
+        audio = f.read()
+    tts_counters.incr("catalog_hits")
+    return audio
+
+
+def generate_tts_audio(text_or_info, lang='en', is_full_info=False, for_url=False):
     
+    text = ''
     try:
-        lang = lang.lower().strip()
-        if lang not in SUPPORTED_LANGUAGES:
-            print(f"[TTS Warning] Unsupported language code: {lang}. Defaulting to 'en'.")
-            lang = 'en'
+        text, lang = resolve_tts_text(text_or_info, lang, is_full_info)
+        if text is None:
+            return None, b''
 
-        if is_full_info and isinstance(text_or_info, dict):
-            text = build_tts_content(text_or_info)
-        else:
-            text = str(text_or_info)
+        key = make_tts_key(text, lang)
+        if for_url:
+            remember_tts_recipe(key, text, lang)
+        audio = read_catalog_audio(key)
+        if audio is None:
+            audio = tts_cache.get(key)
+        if audio is None:
+            audio = audio_jobs.run(key, text, lang)
+        return key, audio
 
-        if not text.strip():
-            print("[TTS Info] Empty text received. Skipping generation.")
-            return ''
+    except Exception as e:
+        print(f"[TTS Error] Failed to generate audio for language '{lang}' with text: {(text or '')[:100]}...")
+        print(f"[TTS Error Details] {e}")
+        return None, b''
 
-        if len(text) > 5000:
-            print("[TTS Info] Truncating text to 5000 characters.")
-            text = text[:5000]
 
-        tts = gTTS(text=text, lang=lang)
+def defer_tts_audio(text_or_info, lang='en', is_full_info=False, mode=None):
+
+    mode = mode or TTS_DEFER_MODE
+    try:
+        text, lang = resolve_tts_text(text_or_info, lang, is_full_info)
+        if text is None:
+            return None, None
+
+        key = make_tts_key(text, lang)
+        remember_tts_recipe(key, text, lang)
+        if get_tts_audio_path(key):
+            return key, "ready"
+        if mode == "background":
+            audio_jobs.submit(key, text, lang)
+        return key, "pending"
+
+    except Exception as e:
+        print(f"[TTS Error] Failed to defer audio for language '{lang}': {e}")
+        return None, None
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
-            tts.save(tmp_file.name)
-            temp_path = tmp_file.name
 
-        with open(temp_path, 'rb') as audio_file:
-            encoded_audio = base64.b64encode(audio_file.read()).decode('utf-8')
+def stream_tts_audio(text_or_info, lang='en', is_full_info=False):
 
-        os.remove(temp_path)
-        return encoded_audio
+    text = ''
+    try:
+        text, lang = resolve_tts_text(text_or_info, lang, is_full_info)
+        if text is None:
+            return
+
+        key = make_tts_key(text, lang)
+        audio = read_catalog_audio(key)
+        if audio is None:
+            audio = tts_cache.get(key)
+        if audio is not None:
+            yield audio
+            return
+
+        parts = []
+        skipped = []
+        for part in iter_synthesized_chunks(text, lang, skipped):
+            parts.append(part)
+            yield part
+        if not skipped:
+            tts_cache.put(key, b''.join(parts))
 
     except Exception as e:
-        print(f"[TTS Error] Failed to generate audio for language '{lang}' with text: {text[:100]}...")
+        print(f"[TTS Stream Error] Failed to stream audio for language '{lang}' with text: {(text or '')[:100]}...")
         print(f"[TTS Error Details] {e}")
-        return ''
+
+
+def generate_tts(text_or_info, lang='en', is_full_info=False):
+    _, audio = generate_tts_audio(text_or_info, lang, is_full_info)
+    return base64.b64encode(audio).decode('utf-8') if audio else ''
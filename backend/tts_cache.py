@@ -0,0 +1,131 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+
+from metrics import Counters
+
+EVICTION_CHECK_INTERVAL = 32
+# Audio files and the re-render sidecars AudioJobs keeps next to them share LRU and TTL expiry
+CACHE_SUFFIXES = (".mp3", ".pending.json")
+
+
+def normalize_tts_text(text):
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_tts_key(text, lang):
+    return hashlib.sha256(f"{lang.lower()}\0{normalize_tts_text(text)}".encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024, ttl_seconds=0):
+        self.directory = directory or None
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl_seconds = max(0, float(ttl_seconds))
+        self._lock = threading.Lock()
+        self._stores_since_eviction = 0
+        self.counters = Counters("hits", "misses", "stores", "evictions", "expired")
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def get(self, key):
+        if not self.directory:
+            return None
+
+        path = self.path_for(key)
+        try:
+            if self.ttl_seconds and time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                self.counters.incr("expired")
+                self._remove(path)
+                self.counters.incr("misses")
+                return None
+            with open(path, "rb") as f:
+                audio = f.read()
+            # Reads refresh the access time that LRU eviction orders by
+            os.utime(path)
+        except FileNotFoundError:
+            # Another worker may have evicted it between the check and the read
+            self.counters.incr("misses")
+            return None
+
+        self.counters.incr("hits")
+        return audio
+
+    def put(self, key, audio):
+        if not self.directory or not audio:
+            return
+
+        path = self.path_for(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            # Readers in other workers only ever see a complete file
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[TTS Cache Error] {e}")
+            self._remove(tmp_path)
+            return
+
+        self.counters.incr("stores")
+        with self._lock:
+            self._stores_since_eviction += 1
+            due = self._stores_since_eviction >= EVICTION_CHECK_INTERVAL
+            if due:
+                self._stores_since_eviction = 0
+        if due:
+            self.evict()
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(CACHE_SUFFIXES):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def evict(self):
+        if not self.directory:
+            return
+
+        now = time.time()
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            expired = self.ttl_seconds and now - mtime > self.ttl_seconds
+            if not expired and (not self.max_bytes or total <= self.max_bytes):
+                break
+            if self._remove(path):
+                self.counters.incr("expired" if expired else "evictions")
+            total -= size
+
+    def stats(self):
+        counters = self.counters.snapshot()
+        lookups = counters["hits"] + counters["misses"]
+        entries = self._entries() if self.directory else []
+        return {
+            **counters,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+            "files": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "directory": self.directory,
+        }
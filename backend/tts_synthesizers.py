@@ -0,0 +1,39 @@
+import io
+import threading
+import time
+
+
+class GTTSSynthesizer:
+
+    def synthesize(self, text, lang):
+        from gtts import gTTS
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class FakeSynthesizer:
+
+    # Stand-in for gTTS: sleeps like a remote call whose cost grows with text length
+    def __init__(self, latency=0.0, latency_per_char=0.0):
+        self.latency = latency
+        self.latency_per_char = latency_per_char
+        self.calls = 0
+        self.chars = 0
+        self._lock = threading.Lock()
+
+    def synthesize(self, text, lang):
+        with self._lock:
+            self.calls += 1
+            self.chars += len(text)
+        delay = self.latency + self.latency_per_char * len(text)
+        if delay:
+            time.sleep(delay)
+        # MPEG sync word followed by the text, enough to tell chunks apart
+        return b"\xff\xfb" + f"[{lang}] {text}".encode("utf-8")
+
+
+def create_synthesizer(name):
+    if name == "fake":
+        return FakeSynthesizer()
+    return GTTSSynthesizer()